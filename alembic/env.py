@@ -7,7 +7,7 @@ from alembic import context
 # Add your app to the path
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from app.db import DATABASE_URL, engine
+from app.db import DATABASE_URL, get_primary_engine
 from app.models import Base  # Import your models to ensure they are registered
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -65,7 +65,7 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
-    connectable = engine
+    connectable = get_primary_engine()
 
     with connectable.connect() as connection:
         context.configure(
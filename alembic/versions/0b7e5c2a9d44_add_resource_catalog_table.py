@@ -0,0 +1,40 @@
+"""add resource catalog table
+
+Revision ID: 0b7e5c2a9d44
+Revises: f19c3b7a5d20
+Create Date: 2025-07-08 14:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.constants import DEFAULT_PROGRAM_CODES
+
+# revision identifiers, used by Alembic.
+revision: str = '0b7e5c2a9d44'
+down_revision: Union[str, None] = 'f19c3b7a5d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: create resource catalog and seed the existing program codes."""
+    catalog = op.create_table(
+        'CONSTRUCTION_RESOURCE_CATALOG',
+        sa.Column('program_code', sa.String(length=10), nullable=False),
+        sa.Column('active', sa.Boolean(), nullable=False),
+        sa.Column('fund_code', sa.String(length=10), nullable=True),
+        sa.Column('display_order', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('program_code')
+    )
+    op.bulk_insert(catalog, [
+        {'program_code': code, 'active': True, 'fund_code': None, 'display_order': i}
+        for i, code in enumerate(DEFAULT_PROGRAM_CODES)
+    ])
+
+
+def downgrade() -> None:
+    """Downgrade schema: drop resource catalog."""
+    op.drop_table('CONSTRUCTION_RESOURCE_CATALOG')
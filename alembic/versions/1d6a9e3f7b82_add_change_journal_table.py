@@ -0,0 +1,51 @@
+"""add change journal table
+
+Revision ID: 1d6a9e3f7b82
+Revises: 0b7e5c2a9d44
+Create Date: 2025-07-15 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1d6a9e3f7b82'
+down_revision: Union[str, None] = '0b7e5c2a9d44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: create change journal table and the sequence row its seqs come from."""
+    op.create_table(
+        'CONSTRUCTION_CHANGE_JOURNAL',
+        sa.Column('seq', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('table_name', sa.String(length=64), nullable=False),
+        sa.Column('row_key', sa.String(length=255), nullable=False),
+        sa.Column('operation', sa.String(length=10), nullable=False),
+        sa.Column('before', sa.Text(), nullable=True),
+        sa.Column('after', sa.Text(), nullable=True),
+        sa.Column('changed_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('seq')
+    )
+    op.create_index(
+        'IX_CONSTRUCTION_CHANGE_JOURNAL_TABLE_SEQ', 'CONSTRUCTION_CHANGE_JOURNAL',
+        ['table_name', 'seq'], unique=False,
+    )
+    sequence = op.create_table(
+        'CONSTRUCTION_CHANGE_SEQUENCE',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('value', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(sequence, [{'name': 'journal', 'value': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema: drop change journal and sequence tables."""
+    op.drop_table('CONSTRUCTION_CHANGE_SEQUENCE')
+    op.drop_index('IX_CONSTRUCTION_CHANGE_JOURNAL_TABLE_SEQ', table_name='CONSTRUCTION_CHANGE_JOURNAL')
+    op.drop_table('CONSTRUCTION_CHANGE_JOURNAL')
@@ -0,0 +1,127 @@
+"""add integer fiscal year, run id and clustered key to construction sources
+
+Revision ID: 2f8b4c6d1e93
+Revises: 1d6a9e3f7b82
+Create Date: 2025-07-22 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f8b4c6d1e93'
+down_revision: Union[str, None] = '1d6a9e3f7b82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = 'CONSTRUCTION_SOURCES'
+KEY_COLUMNS = ['resource', 'flow_type', 'fiscal_year', 'flow_source']
+
+# Rows updated per statement, each committed on its own
+BATCH_SIZE = 10000
+
+sources = sa.table(
+    TABLE,
+    *(sa.column(c, sa.String) for c in KEY_COLUMNS),
+    sa.column('run_id', sa.Integer),
+)
+runs = sa.table('CONSTRUCTION_PROJECTION_RUNS', sa.column('id', sa.Integer))
+
+# Swaps the clustered primary key for the narrow clustered index, then builds
+# the nonclustered indexes. Online where the edition supports it
+# (Enterprise/Developer), otherwise a regular build.
+MSSQL_RECLUSTER = """
+DECLARE @pk sysname = (
+    SELECT name FROM sys.key_constraints
+    WHERE parent_object_id = OBJECT_ID('CONSTRUCTION_SOURCES') AND type = 'PK'
+);
+DECLARE @with nvarchar(50) = CASE WHEN SERVERPROPERTY('EngineEdition') = 3 THEN ' WITH (ONLINE = ON)' ELSE '' END;
+EXEC('ALTER TABLE CONSTRUCTION_SOURCES DROP CONSTRAINT ' + QUOTENAME(@pk) + @with);
+EXEC('CREATE CLUSTERED INDEX IX_CONSTRUCTION_SOURCES_RESOURCE_YEAR ON CONSTRUCTION_SOURCES '
+    + '(resource, fiscal_year_num)' + @with);
+EXEC('ALTER TABLE CONSTRUCTION_SOURCES ADD CONSTRAINT PK_CONSTRUCTION_SOURCES PRIMARY KEY NONCLUSTERED '
+    + '(resource, flow_type, fiscal_year, flow_source)' + @with);
+EXEC('CREATE INDEX IX_CONSTRUCTION_SOURCES_SOURCE_YEAR ON CONSTRUCTION_SOURCES '
+    + '(flow_source, fiscal_year_num)' + @with);
+"""
+
+MSSQL_UNCLUSTER = """
+DROP INDEX IX_CONSTRUCTION_SOURCES_SOURCE_YEAR ON CONSTRUCTION_SOURCES;
+ALTER TABLE CONSTRUCTION_SOURCES DROP CONSTRAINT PK_CONSTRUCTION_SOURCES;
+DROP INDEX IX_CONSTRUCTION_SOURCES_RESOURCE_YEAR ON CONSTRUCTION_SOURCES;
+ALTER TABLE CONSTRUCTION_SOURCES ADD CONSTRAINT PK_CONSTRUCTION_SOURCES PRIMARY KEY CLUSTERED
+    (resource, flow_type, fiscal_year, flow_source);
+"""
+
+
+def _after(columns, key):
+    """Rows whose key sorts after key, spelled out because SQL Server has no row-value comparison."""
+    clauses = []
+    for i, column in enumerate(columns):
+        clauses.append(sa.and_(*(c == v for c, v in zip(columns[:i], key)), column > key[i]))
+    return sa.or_(*clauses)
+
+
+def backfill(connection, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Fill run_id in place, in bounded primary key ranges.
+
+    Each pass reads the next batch_size keys, a seek on the primary key,
+    and updates just that range, so each statement locks a bounded set of
+    rows briefly and the table stays readable and writable throughout.
+    Only rows still NULL are touched, so the backfill can be rerun and
+    never overwrites rows written meanwhile. Projected rows go to the
+    latest recorded run, everything else to run 0. Returns the rows updated.
+    """
+    key = [sources.c[c] for c in KEY_COLUMNS]
+    last_run = connection.execute(sa.select(sa.func.max(runs.c.id))).scalar() or 1
+    last = None
+    updated = 0
+    while True:
+        start = sa.true() if last is None else _after(key, last)
+        keys = connection.execute(sa.select(*key).where(start).order_by(*key).limit(batch_size)).all()
+        if not keys:
+            return updated
+        end = keys[-1]
+        result = connection.execute(
+            sources.update()
+            .where(start, sa.not_(_after(key, end)), sources.c.run_id.is_(None))
+            .values(run_id=sa.case((sources.c.flow_source == 'PROJECTED', last_run), else_=0))
+        )
+        updated += result.rowcount
+        last = end
+
+
+def upgrade() -> None:
+    """Upgrade schema: add year/run columns in place, backfill run ids in batches and build the new keys."""
+    # Both additions are metadata-only: the computed year is not persisted,
+    # its values are materialised by the indexes below, and run_id is
+    # nullable, so existing rows read NULL until backfilled
+    op.add_column(TABLE, sa.Column(
+        'fiscal_year_num', sa.Integer(), sa.Computed('CAST(fiscal_year AS int)', persisted=False),
+    ))
+    op.add_column(TABLE, sa.Column('run_id', sa.Integer(), server_default='0', nullable=True))
+
+    # Commit every batch instead of holding one transaction over the whole table
+    with op.get_context().autocommit_block():
+        backfill(op.get_bind())
+        if op.get_bind().dialect.name == 'mssql':
+            op.execute(MSSQL_RECLUSTER)
+        else:
+            op.create_index('IX_CONSTRUCTION_SOURCES_RESOURCE_YEAR', TABLE, ['resource', 'fiscal_year_num'], unique=False)
+            op.create_index('IX_CONSTRUCTION_SOURCES_SOURCE_YEAR', TABLE, ['flow_source', 'fiscal_year_num'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema: restore the clustered primary key and drop year/run columns."""
+    if op.get_bind().dialect.name == 'mssql':
+        op.execute(MSSQL_UNCLUSTER)
+    else:
+        op.drop_index('IX_CONSTRUCTION_SOURCES_SOURCE_YEAR', table_name=TABLE)
+        op.drop_index('IX_CONSTRUCTION_SOURCES_RESOURCE_YEAR', table_name=TABLE)
+    with op.batch_alter_table(TABLE) as batch_op:
+        batch_op.drop_column('run_id', mssql_drop_default=True)
+        batch_op.drop_column('fiscal_year_num')
@@ -0,0 +1,32 @@
+"""add budget program key index
+
+Revision ID: b61d4e9f0c17
+Revises: a2f8c0b5a32f
+Create Date: 2025-06-24 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b61d4e9f0c17'
+down_revision: Union[str, None] = 'a2f8c0b5a32f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: index budget lines by program code and full key for drilldown seeks."""
+    op.create_index(
+        'IX_CONSTRUCTION_BUDGET_PROGRAM_KEY',
+        'CONSTRUCTION_BUDGET',
+        ['program_code', 'budget_period', 'fund_code', 'project_id', 'activity_id'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema: drop the drilldown index."""
+    op.drop_index('IX_CONSTRUCTION_BUDGET_PROGRAM_KEY', table_name='CONSTRUCTION_BUDGET')
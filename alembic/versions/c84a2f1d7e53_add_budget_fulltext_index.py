@@ -0,0 +1,61 @@
+"""add budget full-text index
+
+Revision ID: c84a2f1d7e53
+Revises: b61d4e9f0c17
+Create Date: 2025-06-26 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.budget_search import FTS_TABLE, SQLITE_FTS_DDL, SQLITE_FTS_DROP
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c84a2f1d7e53'
+down_revision: Union[str, None] = 'b61d4e9f0c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: full-text index over budget line descriptions."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        # Existing lines keep their current rowid as a stable key; the insert trigger numbers new ones
+        op.add_column('CONSTRUCTION_BUDGET', sa.Column('line_id', sa.Integer(), nullable=True))
+        op.execute("UPDATE CONSTRUCTION_BUDGET SET line_id = rowid")
+        op.create_index('UX_CONSTRUCTION_BUDGET_LINE_ID', 'CONSTRUCTION_BUDGET', ['line_id'], unique=True)
+        for ddl in SQLITE_FTS_DDL:
+            op.execute(ddl)
+        op.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    elif dialect == "mssql":
+        # Full-text indexes need a single-column unique key
+        op.add_column('CONSTRUCTION_BUDGET', sa.Column('line_id', sa.Integer(), sa.Identity(), nullable=False))
+        op.create_index('UX_CONSTRUCTION_BUDGET_LINE_ID', 'CONSTRUCTION_BUDGET', ['line_id'], unique=True)
+        with op.get_context().autocommit_block():
+            op.execute("CREATE FULLTEXT CATALOG CONSTRUCTION_BUDGET_CATALOG")
+            op.execute(
+                "CREATE FULLTEXT INDEX ON CONSTRUCTION_BUDGET (line_descr) "
+                "KEY INDEX UX_CONSTRUCTION_BUDGET_LINE_ID ON CONSTRUCTION_BUDGET_CATALOG "
+                "WITH CHANGE_TRACKING AUTO"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema: drop the full-text index."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for ddl in SQLITE_FTS_DROP:
+            op.execute(ddl)
+        op.drop_index('UX_CONSTRUCTION_BUDGET_LINE_ID', table_name='CONSTRUCTION_BUDGET')
+        with op.batch_alter_table('CONSTRUCTION_BUDGET') as batch_op:
+            batch_op.drop_column('line_id')
+    elif dialect == "mssql":
+        with op.get_context().autocommit_block():
+            op.execute("DROP FULLTEXT INDEX ON CONSTRUCTION_BUDGET")
+            op.execute("DROP FULLTEXT CATALOG CONSTRUCTION_BUDGET_CATALOG")
+        op.drop_index('UX_CONSTRUCTION_BUDGET_LINE_ID', table_name='CONSTRUCTION_BUDGET')
+        op.drop_column('CONSTRUCTION_BUDGET', 'line_id')
@@ -0,0 +1,172 @@
+"""
+Command-line batch runner for projections, without the web server.
+
+    python -m app.cli project [--force] [--profile out.prof] [--trace-sql] [--memory]
+    python -m app.cli budget-rows [--after-year 2024]
+
+Prints a JSON report to stdout. Only the database and service layers are
+imported (never FastAPI or Jinja), and only once a command runs.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from typing import List, Optional
+
+TOP_N = 20
+
+
+@contextmanager
+def trace_sql(engine, report: dict):
+    """Time every statement executed on the engine, aggregated by SQL text."""
+    from sqlalchemy import event
+
+    stats = defaultdict(lambda: {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+        entry = stats[" ".join(statement.split())]
+        entry["count"] += 1
+        entry["total_ms"] += elapsed
+        entry["max_ms"] = max(entry["max_ms"], elapsed)
+
+    event.listen(engine, "before_cursor_execute", before)
+    event.listen(engine, "after_cursor_execute", after)
+    try:
+        yield
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+        event.remove(engine, "after_cursor_execute", after)
+        ranked = sorted(stats.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        report["sql"] = {
+            "statements": sum(s["count"] for s in stats.values()),
+            "total_ms": round(sum(s["total_ms"] for s in stats.values()), 3),
+            "top": [
+                {"sql": sql, "count": s["count"], "total_ms": round(s["total_ms"], 3), "max_ms": round(s["max_ms"], 3)}
+                for sql, s in ranked[:TOP_N]
+            ],
+        }
+
+
+@contextmanager
+def trace_memory(report: dict):
+    """Record peak traced memory and the top allocation sites."""
+    tracemalloc.start()
+    try:
+        yield
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report["memory"] = {
+            "peak_kb": round(peak / 1024, 1),
+            "top": [
+                {"location": str(stat.traceback), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:TOP_N]
+            ],
+        }
+
+
+@contextmanager
+def profile(path: str, report: dict):
+    """Profile with cProfile, dump pstats to path and report the top cumulative entries."""
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        stats = pstats.Stats(profiler)
+        ranked = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        report["profile"] = {
+            "path": path,
+            "top": [
+                {"function": f"{file}:{line}({func})", "calls": nc, "tottime": round(tt, 4), "cumtime": round(ct, 4)}
+                for (file, line, func), (cc, nc, tt, ct, callers) in ranked[:TOP_N]
+            ],
+        }
+
+
+def command_project(db, args, report: dict):
+    from app.services.projection import run_projection
+
+    phases = []
+    report["status"] = run_projection(
+        db, force=args.force, progress=lambda e: phases.append(e) if e["status"] == "done" else None
+    )
+    report["phases"] = phases
+    return not report["status"].startswith("Failed")
+
+
+def command_budget_rows(db, args, report: dict):
+    from app.services.projection import get_setting, stream_budget_rows
+
+    after_year = args.after_year or get_setting(db, "PRIOR_YEAR", "2024")
+    report["after_year"] = after_year
+    report["rows"] = [[int(r[0]), r[1], r[2]] for r in stream_budget_rows(db, after_year)]
+    return True
+
+
+COMMANDS = {
+    "project": command_project,
+    "budget-rows": command_budget_rows,
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Run construction budget projections.")
+    parser.add_argument("--database-url", help="Override DATABASE_URL")
+    parser.add_argument("--profile", metavar="PATH", help="Write cProfile stats to PATH")
+    parser.add_argument("--trace-sql", action="store_true", help="Report per-statement SQL timings")
+    parser.add_argument("--memory", action="store_true", help="Report tracemalloc top allocations")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    project = sub.add_parser("project", help="Run the full projection")
+    project.add_argument("--force", action="store_true", help="Rerun even if inputs are unchanged")
+
+    budget_rows = sub.add_parser("budget-rows", help="Print the aggregated budget rows")
+    budget_rows.add_argument("--after-year", help="Defaults to the PRIOR_YEAR setting")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from app.db import SessionLocal, get_primary_engine
+
+    report = {"command": args.command}
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        with ExitStack() as stack:
+            # Memory tracing wraps the other tracers so its snapshot covers the whole run
+            if args.memory:
+                stack.enter_context(trace_memory(report))
+            if args.trace_sql:
+                stack.enter_context(trace_sql(get_primary_engine(), report))
+            if args.profile:
+                stack.enter_context(profile(args.profile, report))
+            ok = COMMANDS[args.command](db, args, report)
+    finally:
+        db.close()
+    report["elapsed"] = round(time.perf_counter() - start, 3)
+    json.dump(report, sys.stdout, indent=2, default=str)
+    sys.stdout.write("\n")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,8 @@
-ALLOWED_RESOURCES = ["0916", "0905", "0920", "0930", "0935"]
+# Program codes seeded into the resource catalog
+DEFAULT_PROGRAM_CODES = [
+    '0905', '0910', '0915', '0916', '0917',
+    '0920', '0925', '0930', '0935', '0940', '0945',
+]
 ALLOWED_FLOW_TYPES = ["PROCEEDS", "JPALEASE", "DEVFEES", "STABILIZE"]
 ALLOWED_FISCAL_YEARS = ["2025", "2026", "2027", "2028", "2029", "2030"]
 ALLOWED_FLOW_SOURCES = ["PROJECTED"]
\ No newline at end of file
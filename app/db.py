@@ -1,26 +1,123 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from dotenv import load_dotenv
 import os
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Optional
 
 # Load environment variables from .env file
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Optional read replica; reads fall back to the primary when unset
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL")
+# How long a client's reads stay on the primary after it writes, covering replica lag
+READ_AFTER_WRITE_SECONDS = float(os.getenv("READ_AFTER_WRITE_SECONDS", "30"))
 
-engine = create_engine(DATABASE_URL, echo=False)
-SessionLocal = sessionmaker(bind=engine)
+
+@lru_cache(maxsize=None)
+def get_primary_engine():
+    """The primary engine, created on first use."""
+    if not DATABASE_URL:
+        raise RuntimeError("DATABASE_URL is not set")
+    return create_engine(DATABASE_URL, echo=False)
+
+
+@lru_cache(maxsize=None)
+def get_read_engine():
+    """The read replica engine, or the primary when no replica is configured."""
+    return create_engine(READ_DATABASE_URL, echo=False) if READ_DATABASE_URL else get_primary_engine()
+
+
+class LazySessionMaker(sessionmaker):
+    """A sessionmaker that binds to its engine when the first session is made."""
+
+    def __init__(self, engine_factory, **kw):
+        super().__init__(**kw)
+        self.engine_factory = engine_factory
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=self.engine_factory())
+        return super().__call__(**local_kw)
+
+
+SessionLocal = LazySessionMaker(get_primary_engine)
+ReadSessionLocal = LazySessionMaker(get_read_engine)
 
 Base = declarative_base()
 
+# Per request: a list the request's get_db sessions append commit times to
+client_writes: ContextVar = ContextVar("client_writes", default=None)
+# Per request: whether the client wrote within READ_AFTER_WRITE_SECONDS, from its cookie
+client_wrote_recently: ContextVar = ContextVar("client_wrote_recently", default=False)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_client_flush(session, flush_context):
+    if session.info.get("client_writes") is not None:
+        session.info["client_flushed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _record_client_write(session):
+    """Remember that the requesting client wrote, for read-your-writes routing."""
+    writes = session.info.get("client_writes")
+    if writes is not None and session.info.pop("client_flushed", False):
+        writes.append(time.time())
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_client_flush(session):
+    session.info.pop("client_flushed", None)
+
+
+def note_client_write(at: Optional[float] = None):
+    """Pin this request's client to the primary for a write made on its behalf, such as a projection it ran."""
+    writes = client_writes.get()
+    if writes is not None:
+        writes.append(time.time() if at is None else at)
+
+
+def reads_pinned_to_primary() -> bool:
+    """
+    Whether this request's client wrote recently, so its reads must not risk a lagging replica.
+
+    Writes made through get_db in a request count, as do projections the
+    client ran (see note_client_write); other background commits pin no one.
+    """
+    return client_wrote_recently.get() or bool(client_writes.get())
+
+
+# Tenant serving the current request, set by app.tenants; None means the default database
+current_tenant: ContextVar = ContextVar("current_tenant", default=None)
+
+
 def get_db():
-    """Dependency to get a database session."""
-    db = SessionLocal()
+    """Dependency to get a database session for the current tenant."""
+    tenant = current_tenant.get()
+    db = tenant.SessionLocal() if tenant else SessionLocal()
+    db.info["client_writes"] = client_writes.get()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_read_db():
+    """Dependency to get a read-only session, on the replica unless a write just happened."""
+    tenant = current_tenant.get()
+    if reads_pinned_to_primary():
+        db = tenant.SessionLocal() if tenant else SessionLocal()
+    else:
+        db = tenant.ReadSessionLocal() if tenant else ReadSessionLocal()
     try:
         yield db
     finally:
         db.close()
 
+@lru_cache(maxsize=None)
 def get_engine(name="local"):
     db_url = os.getenv("DATABASE_URL") if name == "local" else os.getenv("PS_DB_URL")
-    return create_engine(db_url, fast_executemany=True)
\ No newline at end of file
+    return create_engine(db_url, fast_executemany=True)
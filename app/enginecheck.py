@@ -0,0 +1,275 @@
+"""
+Reference-vs-candidate harness for projection engines.
+
+Generates random budgets, static rows, stored balances, rates and year
+ranges, runs the row-by-row calc_interest/calc_balance loop against SQLite
+as the oracle, and checks every other engine matches it to the cent. It
+also times each engine against the oracle per input size and compares the
+speedups with a stored baseline.
+
+    python -m app.enginecheck --cases 200 --seed 0
+    python -m app.enginecheck --baseline tests/engine_baseline.json --update-baseline
+
+The speedup check depends on the machine, so its test is marked benchmark
+and left out of the default pytest run; select it with -m benchmark.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models import ConstructionSource
+from app.services.projection import (
+    calc_balance,
+    calc_interest,
+    clean_project_costs,
+    insert_rows,
+    list_resources,
+    list_years,
+)
+from app.services.projection_engine import project_sources
+from app.services.sensitivity import build_inputs, end_equity
+
+PROJECTED_TYPES = ("INTEREST", "BEG_EQUITY", "END_EQUITY")
+STATIC_TYPES = ["PROCEEDS", "DEVFEES", "JPALEASE", "STABILIZE"]
+# Sorts before and after "PROJECTED", so lookups must pick the lowest source
+STORED_SOURCES = ["ACTUAL", "REVISED"]
+
+# (resources, years) per named input size
+SIZES = {"small": (3, 4), "medium": (8, 10), "large": (16, 20)}
+
+# Share of a stored speedup a new measurement may fall to before it counts as a regression
+DEFAULT_MARGIN = 0.25
+
+Key = Tuple[str, str, str]
+
+
+@dataclass
+class Case:
+    """One projection input: the rows present before the loop, and what to project."""
+    base_rows: List[List]
+    years: List[str]
+    resources: List[str]
+    rate: float
+
+
+@dataclass
+class Candidate:
+    name: str
+    run: Callable[[Case], Dict[Key, float]]
+    # Flow types the engine produces, compared against the oracle's
+    flow_types: Tuple[str, ...] = PROJECTED_TYPES
+
+
+def _amount(rng: random.Random) -> float:
+    return round(rng.uniform(-50_000_000, 50_000_000), 2)
+
+
+def generate_case(rng: random.Random, resources: Optional[int] = None, years: Optional[int] = None) -> Case:
+    """
+    Build a random case, shaped like run_projection's inputs.
+
+    Budgets become cost rows through clean_project_costs, including zero
+    amounts it drops. Stored rows cover prior-year END_EQUITY and sources
+    that sort either side of the projection's own rows.
+    """
+    n_resources = resources or rng.randint(1, 5)
+    n_years = years or rng.randint(1, 6)
+    start = rng.randint(2015, 2035)
+    codes = [f"{900 + i:04d}" for i in rng.sample(range(100), n_resources)]
+    periods = list(range(start, start + n_years))
+    rate = rng.choice([0.0, round(rng.uniform(0, 0.12), 4)])
+
+    budget = [
+        (period, code, rng.choice([0.0, _amount(rng)]))
+        for period in periods for code in codes if rng.random() < 0.7
+    ]
+    static_rows = [
+        [code, flow_type, str(period), "PROJECTED", _amount(rng)]
+        for code in codes for flow_type in STATIC_TYPES for period in periods
+        if rng.random() < 0.2
+    ]
+    # The year range and resources come from budget and static rows only
+    if not budget and not static_rows:
+        static_rows.append([codes[0], "PROCEEDS", str(start), "PROJECTED", _amount(rng)])
+
+    stored = []
+    for code in codes:
+        if rng.random() < 0.7:
+            stored.append([code, "END_EQUITY", str(start - 1), rng.choice(STORED_SOURCES), _amount(rng)])
+        for period in periods:
+            for flow_type in ("END_EQUITY", "PROCEEDS", "COSTS"):
+                if rng.random() < 0.05:
+                    stored.append([code, flow_type, str(period), rng.choice(STORED_SOURCES), _amount(rng)])
+
+    return Case(
+        base_rows=stored + static_rows + clean_project_costs(budget),
+        years=list_years(budget, static_rows),
+        resources=list_resources(budget, static_rows),
+        rate=rate,
+    )
+
+
+def run_reference(case: Case) -> Dict[Key, float]:
+    """The oracle: the database loop run_projection uses, on an in-memory SQLite database."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        insert_rows(db, case.base_rows)
+        for res in case.resources:
+            for yr in case.years:
+                calc_interest(db, yr, res, case.rate, run_id=1)
+                calc_balance(db, yr, res, run_id=1)
+        return {
+            (r.resource, r.flow_type, r.fiscal_year): r.amount
+            for r in db.query(ConstructionSource).filter(ConstructionSource.run_id == 1)
+        }
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def run_projection_engine(case: Case) -> Dict[Key, float]:
+    generated = project_sources(case.base_rows, case.years, case.resources, case.rate)
+    return {(r[0], r[1], r[2]): r[4] for r in generated}
+
+
+def run_sensitivity(case: Case) -> Dict[Key, float]:
+    inputs = build_inputs(case.base_rows, case.years, case.resources, case.rate)
+    ends = end_equity(inputs)[0]
+    return {
+        (res, "END_EQUITY", yr): float(ends[i, j])
+        for i, res in enumerate(inputs.resources) for j, yr in enumerate(inputs.years)
+    }
+
+
+CANDIDATES = [
+    Candidate("projection_engine", run_projection_engine),
+    Candidate("sensitivity", run_sensitivity, ("END_EQUITY",)),
+]
+
+
+def compare(expected: Dict[Key, float], actual: Dict[Key, float], flow_types=PROJECTED_TYPES) -> List[str]:
+    """Differences between two results, limited to flow_types; amounts must agree to the cent."""
+    expected = {k: v for k, v in expected.items() if k[1] in flow_types}
+    actual = {k: v for k, v in actual.items() if k[1] in flow_types}
+    problems = [f"missing {k}" for k in sorted(expected.keys() - actual.keys())]
+    problems += [f"unexpected {k}" for k in sorted(actual.keys() - expected.keys())]
+    problems += [
+        f"{k}: expected {expected[k]!r}, got {actual[k]!r}"
+        for k in sorted(expected.keys() & actual.keys())
+        if abs(expected[k] - actual[k]) >= 0.005
+    ]
+    return problems
+
+
+def check_case(case: Case, candidates: List[Candidate] = CANDIDATES) -> Dict[str, List[str]]:
+    """Run every candidate against the oracle; returns the differences per candidate."""
+    expected = run_reference(case)
+    return {c.name: compare(expected, c.run(case), c.flow_types) for c in candidates}
+
+
+def _best_time(func, case: Case, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(case)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def measure_speedups(
+    seed: int = 0,
+    sizes: Dict[str, Tuple[int, int]] = SIZES,
+    candidates: List[Candidate] = CANDIDATES,
+    repeat: int = 3,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Oracle time over candidate time, per candidate and input size.
+
+    Candidates run in well under a millisecond, so they get ten times the
+    runs the oracle does before taking the best time.
+    """
+    speedups: Dict[str, Dict[str, float]] = {c.name: {} for c in candidates}
+    for size, (resources, years) in sizes.items():
+        case = generate_case(random.Random(seed), resources, years)
+        reference = _best_time(run_reference, case, repeat)
+        for c in candidates:
+            speedups[c.name][size] = round(reference / _best_time(c.run, case, repeat * 10), 1)
+    return speedups
+
+
+def load_baseline(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def check_baseline(speedups: Dict[str, Dict[str, float]], baseline: dict) -> List[str]:
+    """
+    Candidates and sizes whose speedup fell below the stored baseline.
+
+    The baseline's margin allows for timing noise between machines: a
+    speedup regresses once it drops below margin times the stored value.
+    """
+    margin = baseline.get("margin", 1.0)
+    regressions = []
+    for name, by_size in baseline["speedup"].items():
+        for size, stored in by_size.items():
+            measured = speedups.get(name, {}).get(size)
+            if measured is not None and measured < stored * margin:
+                regressions.append(f"{name} {size}: {measured}x, baseline {stored}x")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check projection engines against the database loop.")
+    parser.add_argument("--cases", type=int, default=100, help="Random cases to check")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default="tests/engine_baseline.json", help="Stored speedup baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="Record the measured speedups as the baseline")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    failures = {}
+    for seed in range(args.seed, args.seed + args.cases):
+        for name, problems in check_case(generate_case(random.Random(seed))).items():
+            if problems:
+                failures.setdefault(name, {})[seed] = problems[:5]
+
+    speedups = measure_speedups(args.seed)
+    if args.update_baseline:
+        try:
+            margin = load_baseline(args.baseline).get("margin", DEFAULT_MARGIN)
+        except FileNotFoundError:
+            margin = DEFAULT_MARGIN
+        with open(args.baseline, "w") as f:
+            json.dump({"margin": margin, "speedup": speedups}, f, indent=2)
+            f.write("\n")
+        regressions = []
+    else:
+        regressions = check_baseline(speedups, load_baseline(args.baseline))
+
+    report = {"cases": args.cases, "mismatches": failures, "speedup": speedups, "regressions": regressions}
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for name, by_seed in failures.items():
+            for seed, problems in by_seed.items():
+                print(f"MISMATCH {name} seed={seed}: " + "; ".join(problems))
+        for name, by_size in speedups.items():
+            print(f"{name:<20}" + "  ".join(f"{size}={ratio}x" for size, ratio in by_size.items()))
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+    return 1 if failures or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+HTTP load-test harness for the construction budget app.
+
+Seeds a SQLite file, starts the app against it under uvicorn (or targets an
+already-running server with --url) and drives concurrent async clients
+through a weighted mix of dashboard reads and projection runs.
+
+    python -m app.loadtest --concurrency 20 --duration 30 --workers 2
+    python -m app.loadtest --mix settings=50,static_rows_list=45,projection=5 --json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import httpx
+
+PASSPHRASE = "loadtest"
+
+
+@dataclass
+class Scenario:
+    method: str
+    path: str
+
+
+SCENARIOS = {
+    "settings": Scenario("GET", "/api/settings/"),
+    "static_rows": Scenario("GET", "/api/static-rows/"),
+    "static_rows_list": Scenario("GET", "/static-rows/list"),
+    "settings_list": Scenario("GET", "/settings/list"),
+    "budget_lines": Scenario("GET", "/api/budget-lines/"),
+    "projection": Scenario("POST", f"/api/projection/run?passphrase={PASSPHRASE}&force=true"),
+}
+
+DEFAULT_MIX = "settings=30,static_rows=25,static_rows_list=30,settings_list=10,projection=5"
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse 'name=weight,...' into scenario weights."""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def seed_database(path: str, budget_lines: int = 10000):
+    """Create the schema in a SQLite file and fill it with representative data."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db import Base
+    from app.models import ConstructionBudget, ConstructionSetting, ConstructionStaticRow
+    from app.services.projection import STATIC_ROWS
+    from app.services.resource_catalog import seed_catalog
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    # The projection only reads budget lines for programs active in the catalog
+    seed_catalog(db)
+    db.add_all([
+        ConstructionSetting(name="PRIOR_YEAR", value="2024"),
+        ConstructionSetting(name="INT_RATE", value="0.03"),
+    ])
+    db.add_all([
+        ConstructionStaticRow(resource=r[0], flow_type=r[1], fiscal_year=r[2], flow_source=r[3], amount=r[4])
+        for r in STATIC_ROWS
+    ])
+    programs = ["0905", "0916", "0920", "0930", "0935"]
+    rng = random.Random(0)
+    db.add_all([
+        ConstructionBudget(
+            budget_period=2025 + i % 6,
+            fund_code="F",
+            program_code=programs[i % len(programs)],
+            project_id=f"P{i // 100:05d}",
+            activity_id=f"A{i:07d}",
+            line_descr=f"Project {i // 100} activity {i}",
+            monetary_amount=-round(rng.uniform(1000, 500000), 2),
+        )
+        for i in range(budget_lines)
+    ])
+    db.commit()
+    db.close()
+    engine.dispose()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(db_path: str, port: int, workers: int) -> subprocess.Popen:
+    """Start uvicorn serving the app against the seeded database."""
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", READ_DATABASE_URL="", PASSPHRASE=PASSPHRASE)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+
+
+async def wait_until_up(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/readyz")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start within {timeout}s")
+
+
+def response_ok(response: httpx.Response) -> bool:
+    """
+    Whether a 2xx/3xx response body also reports success.
+
+    The projection API reports bad passphrases and failed runs in a 200
+    body, as an "error" key or a "Failed: ..." status.
+    """
+    if "json" not in response.headers.get("content-type", ""):
+        return True
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    if not isinstance(body, dict):
+        return True
+    status = body.get("status")
+    return "error" not in body and not (isinstance(status, str) and status.startswith("Failed"))
+
+
+async def drive(base_url: str, weights: Dict[str, float], concurrency: int, duration: float) -> Dict[str, List]:
+    """
+    Run concurrent clients for duration seconds.
+
+    Returns (latency seconds, ok) samples per scenario.
+    """
+    samples: Dict[str, List] = defaultdict(list)
+    names = list(weights)
+    name_weights = [weights[n] for n in names]
+    deadline = time.monotonic() + duration
+
+    async def client_loop(client: httpx.AsyncClient, rng: random.Random):
+        while time.monotonic() < deadline:
+            name = rng.choices(names, weights=name_weights)[0]
+            scenario = SCENARIOS[name]
+            start = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, scenario.path)
+                ok = response.status_code < 400 and response_ok(response)
+            except httpx.HTTPError:
+                ok = False
+            samples[name].append((time.perf_counter() - start, ok))
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120.0) as client:
+        await asyncio.gather(*(client_loop(client, random.Random(i)) for i in range(concurrency)))
+    return samples
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: Dict[str, List], elapsed: float) -> List[dict]:
+    """Reduce raw samples to throughput, latency percentiles and error rate per route."""
+    report = []
+    for name, items in sorted(samples.items()):
+        latencies = sorted(lat for lat, _ in items)
+        errors = sum(1 for _, ok in items if not ok)
+        report.append({
+            "route": f"{SCENARIOS[name].method} {SCENARIOS[name].path.split('?')[0]}",
+            "requests": len(items),
+            "throughput_rps": round(len(items) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "error_rate": round(errors / len(items), 4) if items else 0.0,
+        })
+    return report
+
+
+def print_report(report: List[dict]):
+    headers = ["route", "requests", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "error_rate"]
+    widths = [max(len(h), *(len(str(r[h])) for r in report)) for h in headers]
+    print("  ".join(h.ljust(w) for h, w in zip(headers, widths)))
+    for row in report:
+        print("  ".join(str(row[h]).ljust(w) for h, w in zip(headers, widths)))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Load-test the construction budget app.")
+    parser.add_argument("--url", help="Target an already-running server instead of starting one")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds to run")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local server")
+    parser.add_argument("--budget-lines", type=int, default=10000, help="Budget lines to seed")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted scenario mix, e.g. settings=50,projection=5")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+    weights = parse_mix(args.mix)
+
+    server = None
+    with tempfile.TemporaryDirectory() as tmp:
+        base_url = args.url
+        if not base_url:
+            db_path = os.path.join(tmp, "loadtest.db")
+            seed_database(db_path, args.budget_lines)
+            port = free_port()
+            server = start_server(db_path, port, args.workers)
+            base_url = f"http://127.0.0.1:{port}"
+        try:
+            asyncio.run(wait_until_up(base_url))
+            start = time.monotonic()
+            samples = asyncio.run(drive(base_url, weights, args.concurrency, args.duration))
+            report = summarize(samples, time.monotonic() - start)
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,72 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.routes.projection import router as projection_router
-from app.routes.static_rows import router as static_rows_router
-from app.routes.static_rows_ui import router as static_rows_ui_router
-from app.routes.settings import router as settings_router
-from app.routes.settings_ui import router as settings_ui_router
-from app.routes.projection_ui import router as projection_ui_router
+from starlette.concurrency import run_in_threadpool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up before uvicorn starts accepting connections, retrying in the background if that fails."""
+    from app.warmup import retry_warmup, try_warmup
+
+    retry = None
+    if not await run_in_threadpool(try_warmup, app):
+        retry = asyncio.create_task(retry_warmup(app))
+    yield
+    if retry is not None:
+        retry.cancel()
+
+
+def create_app() -> FastAPI:
+    """Build the application; routers and their dependencies are imported here, not at module load."""
+    from app.routes.projection import router as projection_router
+    from app.routes.static_rows import router as static_rows_router
+    from app.routes.static_rows_ui import router as static_rows_ui_router
+    from app.routes.settings import router as settings_router
+    from app.routes.settings_ui import router as settings_ui_router
+    from app.routes.projection_ui import router as projection_ui_router
+    from app.routes.budget_lines import router as budget_lines_router
+    from app.routes.budget_lines_ui import router as budget_lines_ui_router
+    from app.routes.changes import router as changes_router
+    from app.routes.health import router as health_router
+    from app.read_after_write import ReadYourWritesMiddleware
+    from app.tenants import TenantMiddleware
+
+    app = FastAPI(title="Construction Budget API", version="1.0.0", lifespan=lifespan)
+    app.state.warmup = None
+
+    # Route each request to its tenant's database, caches and job queue
+    app.add_middleware(TenantMiddleware)
+    # Keep a client's reads on the primary just after it writes
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    # Liveness and readiness probes for the load balancer
+    app.include_router(health_router)
+
+    # UI routes for static rows, settings, and projection management using HTMX
+    app.include_router(static_rows_ui_router)
+    app.include_router(settings_ui_router)
+    app.include_router(projection_ui_router)
+    app.include_router(budget_lines_ui_router)
+
+    # JSON API routes
+    app.include_router(projection_router, prefix="/api", tags=["projection"])
+    app.include_router(static_rows_router, prefix="/api", tags=["static_rows"])
+    app.include_router(settings_router, prefix="/api", tags=["settings"])
+    app.include_router(budget_lines_router, prefix="/api", tags=["budget_lines"])
+    app.include_router(changes_router, prefix="/api", tags=["changes"])
+    return app
 
-app = FastAPI(title="Construction Budget API", version="1.0.0")
 
-# UI routes for static rows, settings, and projection management using HTMX
-app.include_router(static_rows_ui_router)
-app.include_router(settings_ui_router)
-app.include_router(projection_ui_router)
+def __getattr__(name):
+    # `app.main:app` keeps working for uvicorn and tests, built on first access
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# JSON API routes
-app.include_router(projection_router, prefix="/api", tags=["projection"])
-app.include_router(static_rows_router, prefix="/api", tags=["static_rows"])
-app.include_router(settings_router, prefix="/api", tags=["settings"])
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001, reload=True)
\ No newline at end of file
+    uvicorn.run("app.main:create_app", factory=True, host="0.0.0.0", port=8001, reload=True)
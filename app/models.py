@@ -1,15 +1,30 @@
-from sqlalchemy import Column, String, Integer, Float
+from sqlalchemy import Column, String, Integer, Float, Index, DateTime, Boolean, Text, PrimaryKeyConstraint, Identity, Computed, event, func
 from app.db import Base
+from app.services.budget_search import create_sqlite_search_index
 
 
 class ConstructionSource(Base):
     __tablename__ = "CONSTRUCTION_SOURCES"
 
-    resource = Column(String(10), primary_key=True)
-    flow_type = Column(String(50), primary_key=True)
-    fiscal_year = Column(String(10), primary_key=True)
-    flow_source = Column(String(50), primary_key=True)
+    resource = Column(String(10))
+    flow_type = Column(String(50))
+    fiscal_year = Column(String(10))
+    flow_source = Column(String(50))
     amount = Column(Float)
+    # Integer copy of fiscal_year, computed by the database so every write keeps it in sync;
+    # not persisted, so adding it is metadata-only, and the indexes below store its values
+    fiscal_year_num = Column(Integer, Computed("CAST(fiscal_year AS int)", persisted=False))
+    # Projection run that wrote the row; 0 for rows loaded outside a run, such as actuals
+    run_id = Column(Integer, nullable=True, default=0, server_default="0")
+
+    __table_args__ = (
+        PrimaryKeyConstraint("resource", "flow_type", "fiscal_year", "flow_source", mssql_clustered=False),
+        # Clustered in projection access order, one resource's years; kept narrow
+        # because every nonclustered index carries the clustered key
+        Index("IX_CONSTRUCTION_SOURCES_RESOURCE_YEAR", "resource", "fiscal_year_num", mssql_clustered=True),
+        # Projected rows are cleared and reconciled by source, then year range
+        Index("IX_CONSTRUCTION_SOURCES_SOURCE_YEAR", "flow_source", "fiscal_year_num"),
+    )
 
 
 class ConstructionBudget(Base):
@@ -22,6 +37,25 @@ class ConstructionBudget(Base):
     activity_id = Column(String(10), primary_key=True)
     line_descr = Column(String(255), nullable=True)
     monetary_amount = Column(Float)
+    # Single-column key for the full-text index: IDENTITY on SQL Server, set by the index's insert trigger on SQLite
+    line_id = Column(Integer, Identity(), nullable=True)
+
+    __table_args__ = (
+        # Supports drilldown seeks filtered by program code, ordered by the full key
+        Index(
+            "IX_CONSTRUCTION_BUDGET_PROGRAM_KEY",
+            "program_code",
+            "budget_period",
+            "fund_code",
+            "project_id",
+            "activity_id",
+        ),
+        Index("UX_CONSTRUCTION_BUDGET_LINE_ID", "line_id", unique=True),
+    )
+
+
+event.listen(ConstructionBudget.__table__, "after_create", create_sqlite_search_index)
+
 
 class ConstructionStaticRow(Base):
     __tablename__ = "CONSTRUCTION_STATIC_ROWS"
@@ -38,4 +72,51 @@ class ConstructionSetting(Base):
     __tablename__ = "CONSTRUCTION_SETTINGS"
 
     name = Column(String(50), primary_key=True)
-    value = Column(String(255), nullable=False)
\ No newline at end of file
+    value = Column(String(255), nullable=False)
+
+class ConstructionProjectionRun(Base):
+    __tablename__ = "CONSTRUCTION_PROJECTION_RUNS"
+
+    id = Column(Integer, primary_key=True, index=True)
+    fingerprint = Column(String(64), nullable=False)
+    status = Column(String(255), nullable=False)
+    run_at = Column(DateTime, server_default=func.now())
+
+
+class ConstructionResourceCatalog(Base):
+    __tablename__ = "CONSTRUCTION_RESOURCE_CATALOG"
+
+    program_code = Column(String(10), primary_key=True)
+    active = Column(Boolean, nullable=False, default=True)
+    # Fund the program's budget lines are booked to, where it has a single one
+    fund_code = Column(String(10), nullable=True)
+    display_order = Column(Integer, nullable=False, default=0)
+
+
+class ConstructionChangeJournal(Base):
+    __tablename__ = "CONSTRUCTION_CHANGE_JOURNAL"
+
+    # Append-only; seq orders every change in commit order, and "since N" is a range scan on the key
+    seq = Column(Integer, primary_key=True, autoincrement=False)
+    table_name = Column(String(64), nullable=False)
+    row_key = Column(String(255), nullable=False)
+    operation = Column(String(10), nullable=False)
+    before = Column(Text, nullable=True)
+    after = Column(Text, nullable=True)
+    changed_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("IX_CONSTRUCTION_CHANGE_JOURNAL_TABLE_SEQ", "table_name", "seq"),
+    )
+
+
+class ConstructionChangeSequence(Base):
+    __tablename__ = "CONSTRUCTION_CHANGE_SEQUENCE"
+
+    # Last journal seq handed out; its row lock serializes journal writes until commit
+    name = Column(String(64), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+
+# Journal settings and static row edits from every session, wherever the models are used
+import app.services.change_journal  # noqa: E402,F401
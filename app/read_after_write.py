@@ -0,0 +1,50 @@
+import math
+import time
+from http.cookies import SimpleCookie
+
+import app.db as db_module
+from app.db import client_writes, client_wrote_recently
+
+# Holds the time of the client's last write, in epoch seconds
+COOKIE_NAME = "last_write"
+
+
+class ReadYourWritesMiddleware:
+    """
+    Keep a client's reads on the primary for a while after that client writes.
+
+    A request whose get_db session commits a change gets a short-lived
+    cookie; while it is fresh, get_read_db gives that client primary
+    sessions. Every other client keeps reading from the replica.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        window = db_module.READ_AFTER_WRITE_SECONDS
+        wrote_at = 0.0
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                morsel = SimpleCookie(value.decode("latin-1")).get(COOKIE_NAME)
+                try:
+                    wrote_at = max(wrote_at, float(morsel.value)) if morsel else wrote_at
+                except ValueError:
+                    pass
+        writes = []
+        writes_token = client_writes.set(writes)
+        recent_token = client_wrote_recently.set(time.time() - wrote_at < window)
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and writes:
+                cookie = f"{COOKIE_NAME}={max(writes):.3f}; Max-Age={math.ceil(window)}; Path=/; HttpOnly; SameSite=Lax"
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            client_wrote_recently.reset(recent_token)
+            client_writes.reset(writes_token)
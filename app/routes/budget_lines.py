@@ -0,0 +1,41 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional
+from sqlalchemy.orm import Session
+
+from app.db import get_read_db
+from app.schemas import ConstructionBudgetPage, ConstructionBudgetSearchResult
+from app.services.budget_lines import get_budget_lines, get_budget_line_total
+from app.services.budget_search import search_budget_lines
+
+router = APIRouter()
+
+@router.get("/budget-lines/", response_model=ConstructionBudgetPage)
+def read_budget_lines(
+    budget_period: Optional[int] = None,
+    program_code: Optional[str] = None,
+    fund_code: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+):
+    try:
+        rows, next_cursor = get_budget_lines(
+            db, budget_period, program_code, fund_code, cursor, limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    total = None if cursor else get_budget_line_total(db, budget_period, program_code, fund_code)
+    return {"items": rows, "next_cursor": next_cursor, "total_amount": total}
+
+@router.get("/budget-lines/search", response_model=ConstructionBudgetSearchResult)
+def search_budget_line_descriptions(
+    q: str,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+):
+    try:
+        hits, count, total = search_budget_lines(db, q, limit, offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"hits": hits, "match_count": count, "total_amount": total}
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, Request, HTTPException
+from fastapi.responses import HTMLResponse
+from typing import Optional
+from sqlalchemy.orm import Session
+
+from app.db import get_read_db
+from app.templating import templates
+from app.services.budget_lines import get_budget_lines, get_budget_line_total
+
+router = APIRouter()
+
+PAGE_SIZE = 50
+
+
+def _filters(budget_period: Optional[str], program_code: Optional[str], fund_code: Optional[str]) -> dict:
+    """Normalize filter form values, treating blanks as unset."""
+    try:
+        period = int(budget_period) if budget_period else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="budget_period must be a year")
+    return {
+        "budget_period": period,
+        "program_code": program_code or None,
+        "fund_code": fund_code or None,
+    }
+
+
+@router.get("/budget-lines", response_class=HTMLResponse)
+def budget_lines_index(request: Request):
+    """Main page for drilling into budget lines."""
+    return templates.TemplateResponse("budget_lines/index.html", {"request": request})
+
+
+@router.get("/budget-lines/list", response_class=HTMLResponse)
+def budget_lines_list(
+    request: Request,
+    budget_period: Optional[str] = None,
+    program_code: Optional[str] = None,
+    fund_code: Optional[str] = None,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+):
+    """Return one page of budget line table rows, with a load-more row if more exist."""
+    filters = _filters(budget_period, program_code, fund_code)
+    try:
+        rows, next_cursor = get_budget_lines(db, cursor=cursor, limit=PAGE_SIZE, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Only the first page renders the total; later pages append rows
+    total = None if cursor else get_budget_line_total(db, **filters)
+    return templates.TemplateResponse(
+        "budget_lines/partials/row_list.html",
+        {
+            "request": request,
+            "rows": rows,
+            "next_cursor": next_cursor,
+            "total": total,
+            "filters": {k: v for k, v in filters.items() if v is not None},
+        },
+    )
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from sqlalchemy.orm import Session
+
+from app.db import get_read_db
+from app.schemas import ConstructionChangePage
+from app.services.change_journal import changes_since
+
+router = APIRouter()
+
+@router.get("/changes/", response_model=ConstructionChangePage)
+def read_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=10000),
+    table: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+):
+    """Journal entries after since, in commit order."""
+    changes = changes_since(db, since, limit, table)
+    # Pass next_since back as since to continue where this page stopped
+    return {"changes": changes, "next_since": changes[-1].seq if changes else since}
@@ -0,0 +1,24 @@
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.services.fragment_cache import CachedFragment
+
+
+def fragment_response(request: Request, fragment: CachedFragment) -> Response:
+    """
+    Serve a cached HTML fragment, honoring If-None-Match and gzip Accept-Encoding.
+
+    The gzip and identity bodies are different representations, so each
+    gets its own ETag and caches key them on Accept-Encoding.
+    """
+    use_gzip = "gzip" in request.headers.get("accept-encoding", "")
+    etag = fragment.etag[:-1] + '-gz"' if use_gzip else fragment.etag
+    # no-cache makes browsers revalidate every time, so an unchanged list costs a 304
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(fragment.gzip_body, media_type="text/html", headers=headers)
+    return Response(fragment.body, media_type="text/html", headers=headers)
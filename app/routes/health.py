@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.warmup import database_available
+
+router = APIRouter()
+
+
+@router.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readyz(request: Request):
+    """Readiness: warmup has completed and the database is reachable."""
+    app = request.app
+    # A warmup that failed at startup is retried by the lifespan's background task
+    if getattr(app.state, "warmup", None) is None:
+        return JSONResponse({"status": "warming_up"}, status_code=503)
+    if not await run_in_threadpool(database_available):
+        return JSONResponse({"status": "database_unavailable"}, status_code=503)
+    return {"status": "ready", "warmup": app.state.warmup}
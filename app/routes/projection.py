@@ -1,14 +1,80 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
 from sqlalchemy.orm import Session
-from app.db import get_db
-from app.services.projection import run_projection
-from app.config import PASSPHRASE
+from app.db import get_read_db, note_client_write
+from app.services.projection import get_setting
+from app.services.backtest import BacktestBusy, run_backtest
+from app.services.reconciliation import ReconciliationUnavailable, ledger_engine, run_reconciliation
+from app.services.sensitivity import load_inputs, solve_break_even
+from app.tenants import current as current_tenant
 
 router = APIRouter()
 
+# Widest as-of year range one backtest request may ask for
+MAX_BACKTEST_YEARS = 30
+# Each grid point is one vectorised projection per resource, so cap the grid
+MAX_BREAK_EVEN_POINTS = 10001
+
 @router.post("/projection/run")
-def run_construction_projection(passphrase: str, db: Session = Depends(get_db)):
-    if passphrase != PASSPHRASE:
+def run_construction_projection(passphrase: str, force: bool = False):
+    tenant = current_tenant()
+    if passphrase != tenant.passphrase:
         return {"error": "Invalid passphrase"}
-    status = run_projection(db)
-    return {"status": status}
\ No newline at end of file
+    # Queued behind any running projection, so two never write the same tables at once
+    job = tenant.jobs.start(tenant.SessionLocal, force=force, static_rows=tenant.static_rows())
+    status = job.result()
+    # The caller's next reads of the projection must not hit a lagging replica
+    note_client_write(job.finished_at)
+    return {"status": status}
+
+@router.get("/projection/backtest")
+def backtest_construction_projection(start_year: int, end_year: int, db: Session = Depends(get_read_db)):
+    if start_year > end_year:
+        raise HTTPException(status_code=400, detail="start_year must not be after end_year")
+    if end_year - start_year + 1 > MAX_BACKTEST_YEARS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BACKTEST_YEARS} as-of years per backtest")
+    years = list(range(start_year, end_year + 1))
+    try:
+        result = run_backtest(db, years, static_rows=current_tenant().static_rows()).reset_index()
+    except BacktestBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    # NaN percentage errors (zero actuals) are not valid JSON
+    return result.astype(object).where(result.notna(), None).to_dict(orient="records")
+
+@router.get("/projection/reconcile")
+def reconcile_construction_projection(
+    start_year: int,
+    end_year: int,
+    abs_threshold: Optional[float] = None,
+    pct_threshold: Optional[float] = None,
+    flagged_only: bool = True,
+    db: Session = Depends(get_read_db),
+):
+    if start_year > end_year:
+        raise HTTPException(status_code=400, detail="start_year must not be after end_year")
+    if abs_threshold is None:
+        abs_threshold = float(get_setting(db, "RECON_ABS_THRESHOLD", "1000"))
+    if pct_threshold is None:
+        pct_threshold = float(get_setting(db, "RECON_PCT_THRESHOLD", "0.01"))
+    try:
+        result = run_reconciliation(db, ledger_engine(), start_year, end_year, abs_threshold, pct_threshold)
+    except ReconciliationUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if flagged_only:
+        result = result[result["flagged"]]
+    return result.astype(object).where(result.notna(), None).to_dict(orient="records")
+
+@router.get("/projection/break-even")
+def break_even_construction_projection(
+    parameter: str = "INT_RATE",
+    through_year: int = 2030,
+    lower: Optional[float] = None,
+    upper: Optional[float] = None,
+    points: int = Query(2001, ge=2, le=MAX_BREAK_EVEN_POINTS),
+    db: Session = Depends(get_read_db),
+):
+    try:
+        inputs = load_inputs(db, current_tenant().static_rows())
+        return solve_break_even(inputs, parameter, through_year, lower, upper, points)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
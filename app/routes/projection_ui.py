@@ -1,14 +1,20 @@
-from fastapi import APIRouter, Depends, Request, Form
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Request, Form, HTTPException
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 
-from app.db import get_db
-from app.services.projection import run_projection
-from app.config import PASSPHRASE
+from app.db import note_client_write
+from app.templating import templates
+from app.tenants import current as current_tenant
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
+
+# Seconds between keep-alive comments while a phase is running quietly
+KEEPALIVE_SECONDS = 15.0
+
+
+def _sse(event: str, data: str, event_id: int) -> str:
+    """Format one server-sent event; every data line needs its own prefix."""
+    lines = "".join(f"data: {line}\n" for line in data.splitlines())
+    return f"id: {event_id}\nevent: {event}\n{lines}\n"
 
 
 @router.get("/projection", response_class=HTMLResponse)
@@ -24,16 +30,75 @@ def projection_index(request: Request):
 def projection_run_ui(
     request: Request,
     passphrase: str = Form(...),
-    db: Session = Depends(get_db),
+    force: bool = Form(False),
 ):
-    """Handle form submission to run projection and return the result."""
-    if passphrase != PASSPHRASE:
-        status = "Invalid passphrase"
-        error = True
-    else:
-        status = run_projection(db)
-        error = False
+    """Handle form submission by starting the projection and returning its progress stream."""
+    tenant = current_tenant()
+    if passphrase != tenant.passphrase:
+        return templates.TemplateResponse(
+            "projection/partials/result.html",
+            {"request": request, "status": "Invalid passphrase", "error": True},
+        )
+    job = tenant.jobs.start(tenant.SessionLocal, force=force, static_rows=tenant.static_rows())
     return templates.TemplateResponse(
-        "projection/partials/result.html",
-        {"request": request, "status": status, "error": error},
-    )
\ No newline at end of file
+        "projection/partials/progress_stream.html",
+        {"request": request, "job_id": job.id},
+    )
+
+
+@router.get("/projection/progress/{job_id}")
+async def projection_progress(job_id: str, request: Request):
+    """Stream a projection job's progress as server-sent events, ending with its result."""
+    job = current_tenant().jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Projection job not found")
+    last_event_id = request.headers.get("last-event-id")
+    sent = int(last_event_id) + 1 if last_event_id else 0
+    # Progress events take ids 0..n-1 and the result takes n; a client that has
+    # seen the result gets 204, which stops EventSource from reconnecting.
+    if job.done and sent > len(job.events):
+        return Response(status_code=204)
+
+    progress_template = templates.get_template("projection/partials/progress.html")
+    result_template = templates.get_template("projection/partials/result.html")
+
+    async def stream():
+        nonlocal sent
+        while True:
+            count, done = await job.wait_async(sent, KEEPALIVE_SECONDS)
+            if count > sent:
+                # Events that arrived together are sent as one update of the running summary
+                sent = count
+                html = progress_template.render(phases=job.summary())
+                yield _sse("progress", html, sent - 1)
+            elif done:
+                html = result_template.render(
+                    status=job.status,
+                    error=job.status.startswith("Failed"),
+                    pin_url=f"/projection/progress/{job.id}/done",
+                )
+                yield _sse("done", html, sent)
+                return
+            else:
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/projection/progress/{job_id}/done", response_class=Response)
+def projection_done(job_id: str):
+    """
+    Pin the client that watched a projection finish to the primary.
+
+    The result sent at the end of the progress stream posts here, since the
+    stream's own headers went out before the projection committed.
+    """
+    job = current_tenant().jobs.get(job_id)
+    if not job or not job.done:
+        raise HTTPException(status_code=404, detail="Finished projection job not found")
+    note_client_write(job.finished_at)
+    return Response(status_code=204)
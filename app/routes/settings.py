@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from typing import List
 from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.db import get_db, get_read_db
 from app.models import ConstructionSetting
 from app.schemas import (
     ConstructionSettingCreate,
@@ -13,11 +13,11 @@ from app.schemas import (
 router = APIRouter()
 
 @router.get("/settings/", response_model=List[ConstructionSettingRead])
-def read_settings(db: Session = Depends(get_db)):
+def read_settings(db: Session = Depends(get_read_db)):
     return db.query(ConstructionSetting).all()
 
 @router.get("/settings/{name}", response_model=ConstructionSettingRead)
-def get_setting_item(name: str, db: Session = Depends(get_db)):
+def get_setting_item(name: str, db: Session = Depends(get_read_db)):
     setting = db.query(ConstructionSetting).filter(ConstructionSetting.name == name).first()
     if not setting:
         raise HTTPException(status_code=404, detail="Setting not found")
@@ -1,14 +1,17 @@
 from fastapi import APIRouter, Depends, Request, Form, HTTPException
 from fastapi.responses import HTMLResponse, Response
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.db import get_db, get_read_db
+from app.templating import templates
 from app.models import ConstructionSetting
 from app.schemas import ConstructionSettingCreate, ConstructionSettingUpdate
+from app.services.change_journal import latest_sequence
+from app.services.fragment_cache import CachedFragment
+from app.tenants import current as current_tenant
+from app.routes.fragments import fragment_response
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 
 @router.get("/settings", response_class=HTMLResponse)
@@ -17,14 +20,33 @@ def settings_index(request: Request):
     return templates.TemplateResponse("settings/index.html", {"request": request})
 
 
+def list_fragment(db: Session) -> CachedFragment:
+    """
+    The current tenant's settings table body, rebuilt only after the table changes.
+
+    db must be a primary session: a fragment built from a lagging replica
+    would be cached under the new version and served to every client.
+    """
+    list_cache = current_tenant().fragment_cache(ConstructionSetting.__tablename__)
+    # Read before the rows, so a concurrent write leaves the cache stale rather than wrong
+    version = latest_sequence(db, list_cache.table)
+    fragment = list_cache.get(version)
+    if fragment is None:
+        settings = db.query(ConstructionSetting).order_by(ConstructionSetting.name).all()
+        row_template = templates.get_template("settings/partials/row_list.html")
+        fragment = list_cache.build(
+            settings,
+            row_key=lambda s: (s.name, s.value),
+            render_row=lambda s: row_template.render(settings=[s]),
+            version=version,
+        )
+    return fragment
+
+
 @router.get("/settings/list", response_class=HTMLResponse)
 def settings_list(request: Request, db: Session = Depends(get_db)):
-    """Return the table body for the current settings."""
-    settings = db.query(ConstructionSetting).order_by(ConstructionSetting.name).all()
-    return templates.TemplateResponse(
-        "settings/partials/row_list.html",
-        {"request": request, "settings": settings},
-    )
+    """Return the table body for the current settings, from cache while unchanged."""
+    return fragment_response(request, list_fragment(db))
 
 
 @router.get("/settings/create", response_class=HTMLResponse)
@@ -56,7 +78,7 @@ def settings_create(
 
 
 @router.get("/settings/{name}/edit", response_class=HTMLResponse)
-def settings_edit_form(name: str, request: Request, db: Session = Depends(get_db)):
+def settings_edit_form(name: str, request: Request, db: Session = Depends(get_read_db)):
     """Return a form pre-filled for editing an existing setting."""
     setting = db.query(ConstructionSetting).filter(ConstructionSetting.name == name).first()
     if not setting:
@@ -1,18 +1,19 @@
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 from typing import List
-from app.db import get_db
+from app.db import get_db, get_read_db
 from app.models import ConstructionStaticRow
 from app.schemas import ConstructionStaticRowCreate, ConstructionStaticRowUpdate, ConstructionStaticRowRead
+from app.services.resource_catalog import is_active_code
 
 router = APIRouter()
 
 @router.get("/static-rows/", response_model=List[ConstructionStaticRowRead])
-def read_static_rows(db: Session = Depends(get_db)):
+def read_static_rows(db: Session = Depends(get_read_db)):
     return db.query(ConstructionStaticRow).all()
 
 @router.get("/static-rows/{row_id}", response_model=ConstructionStaticRowRead)
-def get_static_row(row_id: int, db: Session = Depends(get_db)):
+def get_static_row(row_id: int, db: Session = Depends(get_read_db)):
     row = db.query(ConstructionStaticRow).filter(ConstructionStaticRow.id == row_id).first()
     if not row:
         raise HTTPException(status_code=404, detail="Static row not found")
@@ -20,6 +21,8 @@ def get_static_row(row_id: int, db: Session = Depends(get_db)):
 
 @router.post("/static-rows/", response_model=ConstructionStaticRowRead)
 def create_static_row(data: ConstructionStaticRowCreate, db: Session = Depends(get_db)):
+    if not is_active_code(db, data.resource):
+        raise HTTPException(status_code=422, detail=f"Invalid resource: {data.resource}")
     row = ConstructionStaticRow(**data.dict())
     db.add(row)
     db.commit()
@@ -31,6 +34,8 @@ def update_static_row(row_id: int, data: ConstructionStaticRowUpdate, db: Sessio
     row = db.query(ConstructionStaticRow).filter(ConstructionStaticRow.id == row_id).first()
     if not row:
         raise HTTPException(status_code=404, detail="Static row not found")
+    if not is_active_code(db, data.resource):
+        raise HTTPException(status_code=422, detail=f"Invalid resource: {data.resource}")
     for field, value in data.dict().items():
         setattr(row, field, value)
     db.commit()
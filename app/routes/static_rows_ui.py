@@ -1,20 +1,33 @@
 from fastapi import APIRouter, Depends, Request, Form, HTTPException
 from fastapi.responses import HTMLResponse, Response
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.db import get_db, get_read_db
+from app.templating import templates
 from app.models import ConstructionStaticRow
 from app.schemas import ConstructionStaticRowCreate, ConstructionStaticRowUpdate
+from app.services.change_journal import latest_sequence
+from app.services.fragment_cache import CachedFragment
+from app.tenants import current as current_tenant
+from app.routes.fragments import fragment_response
+from app.services.resource_catalog import catalog_snapshot, is_active_code
 from app.constants import (
-    ALLOWED_RESOURCES,
     ALLOWED_FLOW_TYPES,
     ALLOWED_FISCAL_YEARS,
     ALLOWED_FLOW_SOURCES,
 )
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
+
+
+def _form_options(db: Session) -> dict:
+    """Dropdown options for the static row form."""
+    return {
+        "allowed_resources": catalog_snapshot(db).ordered,
+        "allowed_flow_types": ALLOWED_FLOW_TYPES,
+        "allowed_fiscal_years": ALLOWED_FISCAL_YEARS,
+        "allowed_flow_sources": ALLOWED_FLOW_SOURCES,
+    }
 
 
 @router.get("/static-rows", response_class=HTMLResponse)
@@ -23,30 +36,41 @@ def static_rows_index(request: Request):
     return templates.TemplateResponse("static_rows/index.html", {"request": request})
 
 
+def list_fragment(db: Session) -> CachedFragment:
+    """The current tenant's static rows table body, rebuilt only after the table changes; db must be a primary session."""
+    list_cache = current_tenant().fragment_cache(ConstructionStaticRow.__tablename__)
+    # Read before the rows, so a concurrent write leaves the cache stale rather than wrong
+    version = latest_sequence(db, list_cache.table)
+    fragment = list_cache.get(version)
+    if fragment is None:
+        rows = db.query(ConstructionStaticRow).order_by(ConstructionStaticRow.id).all()
+        row_template = templates.get_template("static_rows/partials/row_list.html")
+        fragment = list_cache.build(
+            rows,
+            row_key=lambda r: (r.id, r.resource, r.flow_type, r.fiscal_year, r.flow_source, r.amount),
+            render_row=lambda r: row_template.render(rows=[r]),
+            version=version,
+        )
+    return fragment
+
+
 @router.get("/static-rows/list", response_class=HTMLResponse)
 def static_rows_list(request: Request, db: Session = Depends(get_db)):
-    """Return the table body for the current static rows."""
-    rows = db.query(ConstructionStaticRow).order_by(ConstructionStaticRow.id).all()
-    return templates.TemplateResponse(
-        "static_rows/partials/row_list.html",
-        {"request": request, "rows": rows},
-    )
+    """Return the table body for the current static rows, from cache while unchanged."""
+    return fragment_response(request, list_fragment(db))
 
 
 @router.get("/static-rows/create", response_class=HTMLResponse)
-def static_rows_create_form(request: Request):
+def static_rows_create_form(request: Request, db: Session = Depends(get_read_db)):
     """Return an empty form for creating a new static row."""
     return templates.TemplateResponse(
         "static_rows/partials/form.html",
         {
-            "request": request, 
-            "action": "/static-rows/create", 
+            "request": request,
+            "action": "/static-rows/create",
             "row": None,
-            "allowed_resources": ALLOWED_RESOURCES,
-            "allowed_flow_types": ALLOWED_FLOW_TYPES,
-            "allowed_fiscal_years": ALLOWED_FISCAL_YEARS,
-            "allowed_flow_sources": ALLOWED_FLOW_SOURCES,
-            },
+            **_form_options(db),
+        },
     )
 
 
@@ -61,6 +85,8 @@ def static_rows_create(
     db: Session = Depends(get_db),
 ):
     """Handle form submission to create a new static row and return its table row HTML."""
+    if not is_active_code(db, resource):
+        raise HTTPException(status_code=422, detail=f"Invalid resource: {resource}")
     data = ConstructionStaticRowCreate(
         resource=resource,
         flow_type=flow_type,
@@ -79,14 +105,14 @@ def static_rows_create(
 
 
 @router.get("/static-rows/{row_id}/edit", response_class=HTMLResponse)
-def static_rows_edit_form(row_id: int, request: Request, db: Session = Depends(get_db)):
+def static_rows_edit_form(row_id: int, request: Request, db: Session = Depends(get_read_db)):
     """Return a form pre-filled for editing an existing static row."""
     row = db.query(ConstructionStaticRow).filter(ConstructionStaticRow.id == row_id).first()
     if not row:
         raise HTTPException(status_code=404, detail="Static row not found")
     return templates.TemplateResponse(
         "static_rows/partials/form.html",
-        {"request": request, "action": f"/static-rows/{row_id}/edit", "row": row},
+        {"request": request, "action": f"/static-rows/{row_id}/edit", "row": row, **_form_options(db)},
     )
 
 
@@ -105,6 +131,8 @@ def static_rows_edit(
     row = db.query(ConstructionStaticRow).filter(ConstructionStaticRow.id == row_id).first()
     if not row:
         raise HTTPException(status_code=404, detail="Static row not found")
+    if not is_active_code(db, resource):
+        raise HTTPException(status_code=422, detail=f"Invalid resource: {resource}")
     data = ConstructionStaticRowUpdate(
         resource=resource,
         flow_type=flow_type,
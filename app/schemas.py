@@ -1,12 +1,17 @@
+import json
+from datetime import datetime
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from typing import List, Optional
 from app.constants import (
-    ALLOWED_RESOURCES,
     ALLOWED_FLOW_TYPES,
     ALLOWED_FISCAL_YEARS,
     ALLOWED_FLOW_SOURCES,
 )
 
+_FLOW_TYPES = frozenset(ALLOWED_FLOW_TYPES)
+_FISCAL_YEARS = frozenset(ALLOWED_FISCAL_YEARS)
+_FLOW_SOURCES = frozenset(ALLOWED_FLOW_SOURCES)
+
 class ConstructionSourceBase(BaseModel):
     resource: str
     flow_type: str
@@ -44,6 +49,23 @@ class ConstructionBudget(ConstructionBudgetBase):
     class Config:
         orm_mode = True
 
+
+class ConstructionBudgetPage(BaseModel):
+    items: List[ConstructionBudget]
+    next_cursor: Optional[str] = None
+    # Only on the first page; later pages leave it out to skip the filtered SUM
+    total_amount: Optional[float] = None
+
+
+class ConstructionBudgetSearchHit(ConstructionBudgetBase):
+    rank: float
+
+
+class ConstructionBudgetSearchResult(BaseModel):
+    hits: List[ConstructionBudgetSearchHit]
+    match_count: int
+    total_amount: float
+
 class ConstructionStaticRowBase(BaseModel):
     resource: str
     flow_type: str
@@ -51,27 +73,21 @@ class ConstructionStaticRowBase(BaseModel):
     flow_source: str
     amount: float
 
-    @field_validator("resource")
-    def validate_resource(cls, v):
-        if v not in ALLOWED_RESOURCES:
-            raise ValueError(f"Invalid resource: {v}")
-        return v
-
     @field_validator("flow_type")
     def validate_flow_type(cls, v):
-        if v not in ALLOWED_FLOW_TYPES:
+        if v not in _FLOW_TYPES:
             raise ValueError(f"Invalid flow type: {v}")
         return v
 
     @field_validator("fiscal_year")
     def validate_fiscal_year(cls, v):
-        if v not in ALLOWED_FISCAL_YEARS:
+        if v not in _FISCAL_YEARS:
             raise ValueError(f"Invalid fiscal year: {v}")
         return v
 
     @field_validator("flow_source")
     def validate_flow_source(cls, v):
-        if v not in ALLOWED_FLOW_SOURCES:
+        if v not in _FLOW_SOURCES:
             raise ValueError(f"Invalid flow source: {v}")
         return v
 
@@ -103,4 +119,26 @@ class ConstructionSettingUpdate(ConstructionSettingBase):
 
 class ConstructionSettingRead(ConstructionSettingBase):
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+
+class ConstructionChangeRead(BaseModel):
+    seq: int
+    table_name: str
+    row_key: list
+    operation: str
+    before: Optional[dict] = None
+    after: Optional[dict] = None
+    changed_at: Optional[datetime] = None
+
+    @field_validator("row_key", "before", "after", mode="before")
+    def decode_json(cls, v):
+        return json.loads(v) if isinstance(v, str) else v
+
+    class Config:
+        orm_mode = True
+
+
+class ConstructionChangePage(BaseModel):
+    changes: List[ConstructionChangeRead]
+    next_since: int
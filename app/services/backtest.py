@@ -0,0 +1,205 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app.models import ConstructionSource
+from app.services.projection import (
+    CODE_VERSION,
+    STATIC_ROWS,
+    budget_rows_query,
+    clean_project_costs,
+    get_setting,
+    list_resources,
+    list_years,
+)
+from app.services.projection_engine import ENGINE_VERSION, project_sources
+
+# Ledger rows loaded alongside projections in CONSTRUCTION_SOURCES
+ACTUAL_FLOW_SOURCE = "ACTUAL"
+BACKTEST_FLOW_TYPES = ["END_EQUITY", "INTEREST"]
+KEY_COLUMNS = ["as_of_year", "target_year", "resource", "flow_type"]
+
+# Per tenant scope, so one tenant's backtests never evict another's
+MAX_CACHED_RESULTS = 16
+_caches: "Dict[Optional[str], OrderedDict[str, pd.DataFrame]]" = defaultdict(OrderedDict)
+
+# Worker processes shared by every backtest in this server process
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Backtests running at once; more wait up to BACKTEST_WAIT_SECONDS, then fail as busy
+MAX_CONCURRENT_BACKTESTS = int(os.getenv("MAX_CONCURRENT_BACKTESTS", "2"))
+BACKTEST_WAIT_SECONDS = 30.0
+# Below this many input rows times as-of years, projecting in-process beats shipping inputs to workers
+IN_PROCESS_MAX_WORK = 200_000
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(MAX_CONCURRENT_BACKTESTS)
+
+
+class BacktestBusy(RuntimeError):
+    """Raised when every backtest slot stays taken for BACKTEST_WAIT_SECONDS."""
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """
+    The shared worker pool, created on first use.
+
+    Workers are spawned rather than forked, so they never inherit the
+    server's threads or open connections.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(BACKTEST_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def load_backtest_inputs(db: Session, actual_source: str = ACTUAL_FLOW_SOURCE):
+    """
+    Read everything a backtest needs in bulk: the full budget aggregate, ledger actuals and the rate.
+    """
+    budget = [(int(r[0]), r[1], r[2]) for r in budget_rows_query(db, "0")]
+    actuals = [
+        [r.resource, r.flow_type, r.fiscal_year, r.flow_source, r.amount]
+        for r in db.query(ConstructionSource).filter(ConstructionSource.flow_source == actual_source)
+    ]
+    rate = float(get_setting(db, "INT_RATE", "0.03"))
+    return budget, actuals, rate
+
+
+def project_as_of(as_of_year: int, budget: List, static_rows: List, actuals: List, rate: float) -> List[List]:
+    """
+    Rerun the projection as it would have run with PRIOR_YEAR set to as_of_year.
+
+    Only budget and static rows after the as-of year are projected, and only
+    actuals up to it are known. CONSTRUCTION_BUDGET has no load date, so the
+    budget lines used are today's lines for those periods.
+    """
+    budget_after = [r for r in budget if r[0] > as_of_year]
+    static_after = [r for r in static_rows if int(r[2]) > as_of_year]
+    known = [r for r in actuals if int(r[2]) <= as_of_year]
+    years = list_years(budget_after, static_after)
+    resources = list_resources(budget_after, static_after)
+    base_rows = known + [list(r) for r in static_after] + clean_project_costs(budget_after)
+    return project_sources(base_rows, years, resources, rate)
+
+
+def backtest_fingerprint(as_of_years: List[int], budget, static_rows, actuals, rate: float) -> str:
+    """Hash the backtest inputs and engine versions into a cache key."""
+    payload = json.dumps({
+        "as_of": as_of_years,
+        "budget": budget,
+        "static": [list(r) for r in static_rows],
+        "actuals": actuals,
+        "rate": rate,
+        "version": [CODE_VERSION, ENGINE_VERSION],
+    })
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def error_matrix(as_of_years: List[int], projections: List[List[List]], actuals: List) -> pd.DataFrame:
+    """
+    Compare projected against actual END_EQUITY and INTEREST for every later year.
+
+    Returns a frame indexed by (as_of_year, target_year, resource, flow_type)
+    with projected, actual, error and pct_error columns.
+    """
+    columns = ["resource", "flow_type", "target_year", "flow_source", "amount"]
+    projected = pd.concat(
+        [pd.DataFrame(rows, columns=columns).assign(as_of_year=year) for year, rows in zip(as_of_years, projections)],
+        ignore_index=True,
+    )
+    projected = projected[projected["flow_type"].isin(BACKTEST_FLOW_TYPES)]
+    projected = projected.assign(target_year=projected["target_year"].astype(int))
+    projected = projected[KEY_COLUMNS + ["amount"]].rename(columns={"amount": "projected"})
+
+    actual = pd.DataFrame(actuals, columns=columns)
+    actual = actual[actual["flow_type"].isin(BACKTEST_FLOW_TYPES)]
+    actual = actual.assign(target_year=actual["target_year"].astype(int))
+    actual = actual.groupby(["target_year", "resource", "flow_type"], as_index=False)["amount"].sum()
+    actual = actual.rename(columns={"amount": "actual"})
+
+    # Every actual can be checked against every earlier as-of run
+    keys = pd.DataFrame({"as_of_year": as_of_years}).merge(actual, how="cross")
+    keys = keys[keys["target_year"] > keys["as_of_year"]]
+    merged = keys.merge(projected, on=KEY_COLUMNS, how="left")
+    # The projection only writes INTEREST when positive, so a missing one means zero;
+    # a missing END_EQUITY means the resource/year was not projected at all
+    is_interest = merged["flow_type"] == "INTEREST"
+    merged.loc[is_interest, "projected"] = merged.loc[is_interest, "projected"].fillna(0.0)
+    merged = merged.dropna(subset=["projected"])
+
+    merged["error"] = merged["projected"] - merged["actual"]
+    merged["pct_error"] = merged["error"] / merged["actual"].where(merged["actual"] != 0)
+    return merged.set_index(KEY_COLUMNS).sort_index()[["projected", "actual", "error", "pct_error"]]
+
+
+def project_many(as_of_years: List[int], budget: List, static_rows: List, actuals: List, rate: float) -> List[List[List]]:
+    """project_as_of for several as-of years, so a worker receives the inputs once per chunk."""
+    return [project_as_of(year, budget, static_rows, actuals, rate) for year in as_of_years]
+
+
+def _chunks(items: List, count: int) -> List[List]:
+    size = -(-len(items) // count)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def run_backtest(
+    db: Session,
+    as_of_years: List[int],
+    in_process: Optional[bool] = None,
+    static_rows: Optional[List[List]] = None,
+) -> pd.DataFrame:
+    """
+    Backtest the projection for each as-of year.
+
+    Small backtests run in-process; larger ones are split into one chunk per
+    worker of the shared pool. in_process forces either way. Results are
+    cached by a fingerprint of every input, per tenant. static_rows
+    defaults to STATIC_ROWS. Raises BacktestBusy when too many backtests
+    are already running.
+    """
+    if static_rows is None:
+        static_rows = STATIC_ROWS
+    as_of_years = sorted(set(as_of_years))
+    budget, actuals, rate = load_backtest_inputs(db)
+    key = backtest_fingerprint(as_of_years, budget, static_rows, actuals, rate)
+    cache = _caches[db.info.get("tenant")]
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key].copy()
+
+    if in_process is None:
+        work = (len(budget) + len(static_rows) + len(actuals)) * len(as_of_years)
+        in_process = len(as_of_years) == 1 or work <= IN_PROCESS_MAX_WORK
+    if not _slots.acquire(timeout=BACKTEST_WAIT_SECONDS):
+        raise BacktestBusy("Too many backtests are running; try again shortly")
+    try:
+        if in_process:
+            projections = project_many(as_of_years, budget, static_rows, actuals, rate)
+        else:
+            chunks = _chunks(as_of_years, BACKTEST_WORKERS)
+            projections = [
+                rows
+                for chunk in get_pool().map(
+                    project_many, chunks, repeat(budget), repeat(static_rows), repeat(actuals), repeat(rate),
+                )
+                for rows in chunk
+            ]
+    finally:
+        _slots.release()
+    result = error_matrix(as_of_years, projections, actuals)
+
+    cache[key] = result
+    while len(cache) > MAX_CACHED_RESULTS:
+        cache.popitem(last=False)
+    return result.copy()
@@ -0,0 +1,108 @@
+import base64
+import json
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import Session
+
+from app.models import ConstructionBudget
+
+# Primary key columns in index order; drilldown pages are sorted and seeked on these
+KEY_COLUMNS = [
+    ConstructionBudget.budget_period,
+    ConstructionBudget.fund_code,
+    ConstructionBudget.program_code,
+    ConstructionBudget.project_id,
+    ConstructionBudget.activity_id,
+]
+
+
+def encode_cursor(row) -> str:
+    """
+    Encode the key columns of a budget line into an opaque page cursor.
+    """
+    values = [getattr(row, col.key) for col in KEY_COLUMNS]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> List:
+    """
+    Decode a page cursor back into key column values.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(KEY_COLUMNS):
+        raise ValueError("Invalid cursor")
+    # budget_period is an integer (bool is an int subclass, so rule it out); the rest are strings
+    if type(values[0]) is not int or not all(isinstance(v, str) for v in values[1:]):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def seek_after(values: List):
+    """
+    Build a predicate selecting rows strictly after the given key values.
+
+    Expanded into OR/AND form rather than a row-value comparison so it also
+    runs on SQL Server.
+    """
+    clauses = []
+    for i, col in enumerate(KEY_COLUMNS):
+        equal = [KEY_COLUMNS[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal, col > values[i]))
+    return or_(*clauses)
+
+
+def apply_filters(query, budget_period: Optional[int], program_code: Optional[str], fund_code: Optional[str]):
+    """
+    Apply the optional drilldown filters to a budget query.
+    """
+    if budget_period is not None:
+        query = query.filter(ConstructionBudget.budget_period == budget_period)
+    if program_code is not None:
+        query = query.filter(ConstructionBudget.program_code == program_code)
+    if fund_code is not None:
+        query = query.filter(ConstructionBudget.fund_code == fund_code)
+    return query
+
+
+def get_budget_lines(
+    db: Session,
+    budget_period: Optional[int] = None,
+    program_code: Optional[str] = None,
+    fund_code: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> Tuple[List[ConstructionBudget], Optional[str]]:
+    """
+    Fetch one page of budget lines in key order, seeking past the cursor.
+
+    Returns the page and the cursor for the next page, or None on the last page.
+    """
+    query = apply_filters(db.query(ConstructionBudget), budget_period, program_code, fund_code)
+    if cursor:
+        query = query.filter(seek_after(decode_cursor(cursor)))
+    # Fetch one extra row to learn whether another page exists without counting
+    rows = query.order_by(*KEY_COLUMNS).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+def get_budget_line_total(
+    db: Session,
+    budget_period: Optional[int] = None,
+    program_code: Optional[str] = None,
+    fund_code: Optional[str] = None,
+) -> float:
+    """
+    Sum the monetary amount of all budget lines matching the filters.
+    """
+    query = apply_filters(
+        db.query(func.sum(ConstructionBudget.monetary_amount)),
+        budget_period, program_code, fund_code,
+    )
+    return query.scalar() or 0.0
@@ -0,0 +1,124 @@
+import re
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+FTS_TABLE = "CONSTRUCTION_BUDGET_FTS"
+
+# SQLite: external-content FTS5 table over line_descr, keyed on line_id and kept in
+# sync by triggers. The insert trigger also assigns line_id, which SQLite cannot
+# generate for a column outside the primary key; unlike the implicit rowid it
+# survives VACUUM, so the index never points at the wrong line.
+SQLITE_FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        line_descr, content='CONSTRUCTION_BUDGET', content_rowid='line_id'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS CONSTRUCTION_BUDGET_FTS_AI AFTER INSERT ON CONSTRUCTION_BUDGET BEGIN
+        UPDATE CONSTRUCTION_BUDGET SET line_id = (SELECT COALESCE(MAX(line_id), 0) + 1 FROM CONSTRUCTION_BUDGET)
+            WHERE rowid = new.rowid AND new.line_id IS NULL;
+        INSERT INTO {FTS_TABLE}(rowid, line_descr)
+            SELECT line_id, line_descr FROM CONSTRUCTION_BUDGET WHERE rowid = new.rowid;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS CONSTRUCTION_BUDGET_FTS_AD AFTER DELETE ON CONSTRUCTION_BUDGET BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, line_descr) VALUES ('delete', old.line_id, old.line_descr);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS CONSTRUCTION_BUDGET_FTS_AU AFTER UPDATE OF line_descr ON CONSTRUCTION_BUDGET BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, line_descr) VALUES ('delete', old.line_id, old.line_descr);
+        INSERT INTO {FTS_TABLE}(rowid, line_descr) VALUES (new.line_id, new.line_descr);
+    END""",
+]
+
+SQLITE_FTS_DROP = [
+    "DROP TRIGGER IF EXISTS CONSTRUCTION_BUDGET_FTS_AU",
+    "DROP TRIGGER IF EXISTS CONSTRUCTION_BUDGET_FTS_AD",
+    "DROP TRIGGER IF EXISTS CONSTRUCTION_BUDGET_FTS_AI",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+LINE_COLUMNS = "b.budget_period, b.fund_code, b.program_code, b.project_id, b.activity_id, b.line_descr, b.monetary_amount"
+
+# Each dialect returns (hits SQL, total SQL); both take :q, hits also takes :limit and :offset
+SEARCH_SQL = {
+    "sqlite": (
+        f"""SELECT {LINE_COLUMNS}, bm25({FTS_TABLE}) AS rank
+        FROM {FTS_TABLE} JOIN CONSTRUCTION_BUDGET b ON b.line_id = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH :q
+        ORDER BY rank, b.line_id
+        LIMIT :limit OFFSET :offset""",
+        f"""SELECT COUNT(*), SUM(b.monetary_amount)
+        FROM {FTS_TABLE} JOIN CONSTRUCTION_BUDGET b ON b.line_id = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH :q""",
+    ),
+    # SQL Server: full-text index keyed on the line_id identity column
+    "mssql": (
+        f"""SELECT {LINE_COLUMNS}, -ft.[RANK] AS rank
+        FROM CONTAINSTABLE(CONSTRUCTION_BUDGET, line_descr, :q) ft
+        JOIN CONSTRUCTION_BUDGET b ON b.line_id = ft.[KEY]
+        ORDER BY ft.[RANK] DESC, b.line_id
+        OFFSET :offset ROWS FETCH NEXT :limit ROWS ONLY""",
+        """SELECT COUNT(*), SUM(b.monetary_amount)
+        FROM CONTAINSTABLE(CONSTRUCTION_BUDGET, line_descr, :q) ft
+        JOIN CONSTRUCTION_BUDGET b ON b.line_id = ft.[KEY]""",
+    ),
+}
+
+
+def create_search_index(db: Session):
+    """
+    Create the SQLite FTS5 index and sync triggers, then index existing lines.
+
+    SQL Server's full-text index is created by migration and needs no setup here.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        return
+    for ddl in SQLITE_FTS_DDL:
+        db.execute(text(ddl))
+    rebuild_search_index(db)
+
+
+def create_sqlite_search_index(target, connection, **kw):
+    """after_create hook on CONSTRUCTION_BUDGET, so create_all builds the SQLite index too."""
+    if connection.dialect.name == "sqlite":
+        for ddl in SQLITE_FTS_DDL:
+            connection.execute(text(ddl))
+
+
+def rebuild_search_index(db: Session):
+    """
+    Re-index every budget line, e.g. after a bulk load that bypassed triggers.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        db.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        db.commit()
+    elif dialect == "mssql":
+        # Full-text population cannot run inside a transaction
+        with db.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("ALTER FULLTEXT INDEX ON CONSTRUCTION_BUDGET START FULL POPULATION"))
+
+
+def build_match_query(q: str, dialect: str) -> str:
+    """
+    Turn free text into a prefix-matching, all-terms query for the dialect.
+    """
+    terms = re.findall(r"\w+", q)
+    if not terms:
+        raise ValueError("Search query has no terms")
+    if dialect == "mssql":
+        return " AND ".join(f'"{t}*"' for t in terms)
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+def search_budget_lines(db: Session, q: str, limit: int = 50, offset: int = 0) -> Tuple[List[dict], int, float]:
+    """
+    Search budget line descriptions, returning ranked hits, match count and total amount.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect not in SEARCH_SQL:
+        raise ValueError(f"Full-text search is not supported on {dialect}")
+    hits_sql, total_sql = SEARCH_SQL[dialect]
+    match = build_match_query(q, dialect)
+    hits = db.execute(text(hits_sql), {"q": match, "limit": limit, "offset": offset}).mappings().all()
+    count, total = db.execute(text(total_sql), {"q": match}).one()
+    return [dict(h) for h in hits], count, total or 0.0
@@ -0,0 +1,127 @@
+import json
+from itertools import chain
+from typing import List, Optional
+
+from sqlalchemy import event, func, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.models import ConstructionChangeJournal, ConstructionChangeSequence, ConstructionSetting, ConstructionStaticRow
+
+JOURNALED_TABLES = {ConstructionSetting.__tablename__, ConstructionStaticRow.__tablename__}
+
+# Buffered entries are written early once this many pile up in one transaction
+JOURNAL_BATCH_SIZE = 500
+
+# Name of the CONSTRUCTION_CHANGE_SEQUENCE row journal seqs are drawn from
+SEQUENCE_NAME = "journal"
+
+
+def _column_values(state, added: bool) -> dict:
+    """Column values from attribute history: new values if added, else the values before the flush."""
+    values = {}
+    for attr in state.mapper.column_attrs:
+        history = state.attrs[attr.key].history
+        current = history.added if added else history.deleted
+        found = list(current or history.unchanged)
+        if found:
+            values[attr.key] = found[0]
+    return values
+
+
+def _entry(obj, operation: str) -> Optional[dict]:
+    state = inspect(obj)
+    before = None if operation == "INSERT" else _column_values(state, added=False)
+    after = None if operation == "DELETE" else _column_values(state, added=True)
+    if operation == "UPDATE" and before == after:
+        return None
+    return {
+        "table_name": obj.__table__.name,
+        "row_key": json.dumps(list(state.mapper.primary_key_from_instance(obj)), default=str),
+        "operation": operation,
+        "before": None if before is None else json.dumps(before, default=str),
+        "after": None if after is None else json.dumps(after, default=str),
+    }
+
+
+def _next_sequence(connection, count: int) -> int:
+    """
+    Reserve count seqs and return the first.
+
+    The update locks the sequence row until the transaction ends, so a
+    later transaction cannot take seqs until this one commits: seqs become
+    visible in the order they were handed out.
+    """
+    sequence = ConstructionChangeSequence.__table__
+    connection.execute(
+        update(sequence).where(sequence.c.name == SEQUENCE_NAME).values(value=sequence.c.value + count)
+    )
+    last = connection.execute(select(sequence.c.value).where(sequence.c.name == SEQUENCE_NAME)).scalar_one()
+    return last - count + 1
+
+
+def _write_buffer(session):
+    """Number the buffered entries and insert them in one executemany, inside the session's transaction."""
+    buffer = session.info.pop("journal_buffer", None)
+    if buffer:
+        connection = session.connection()
+        first = _next_sequence(connection, len(buffer))
+        for seq, entry in enumerate(buffer, first):
+            entry["seq"] = seq
+        connection.execute(insert(ConstructionChangeJournal), buffer)
+
+
+@event.listens_for(ConstructionChangeSequence.__table__, "after_create")
+def _seed_sequence(target, connection, **kw):
+    connection.execute(target.insert().values(name=SEQUENCE_NAME, value=0))
+
+
+@event.listens_for(Session, "after_flush")
+def _buffer_changes(session, flush_context):
+    """Record before/after values of journaled rows touched by the flush."""
+    buffer = session.info.setdefault("journal_buffer", [])
+    changes = chain(
+        ((obj, "INSERT") for obj in session.new),
+        ((obj, "UPDATE") for obj in session.dirty),
+        ((obj, "DELETE") for obj in session.deleted),
+    )
+    for obj, operation in changes:
+        if getattr(obj, "__table__", None) is not None and obj.__table__.name in JOURNALED_TABLES:
+            entry = _entry(obj, operation)
+            if entry:
+                buffer.append(entry)
+    if len(buffer) >= JOURNAL_BATCH_SIZE:
+        _write_buffer(session)
+
+
+@event.listens_for(Session, "before_commit")
+def _flush_journal(session):
+    # Flush first so edits pending at commit time are journaled in the same transaction
+    session.flush()
+    _write_buffer(session)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_journal(session):
+    session.info.pop("journal_buffer", None)
+
+
+def changes_since(db: Session, since: int, limit: int = 1000, table: Optional[str] = None) -> List[ConstructionChangeJournal]:
+    """
+    Journal entries with seq above since, oldest first.
+
+    Seqs are handed out under the sequence row lock held until commit, so
+    once an entry is visible every lower seq is too; a consumer that has
+    read up to N never misses an entry by asking for since=N.
+    """
+    query = db.query(ConstructionChangeJournal).filter(ConstructionChangeJournal.seq > since)
+    if table:
+        query = query.filter(ConstructionChangeJournal.table_name == table)
+    return query.order_by(ConstructionChangeJournal.seq).limit(limit).all()
+
+
+def latest_sequence(db: Session, table: Optional[str] = None) -> int:
+    """The highest sequence number journaled so far, for one table if given, or 0."""
+    query = db.query(func.max(ConstructionChangeJournal.seq))
+    if table:
+        query = query.filter(ConstructionChangeJournal.table_name == table)
+    return query.scalar() or 0
@@ -0,0 +1,104 @@
+import gzip
+import hashlib
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import chain
+from typing import Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_lock = threading.Lock()
+# Keyed by (tenant scope, table); sessions carry their tenant in session.info
+_versions: Dict[Tuple[Optional[str], str], int] = defaultdict(int)
+
+
+@dataclass
+class CachedFragment:
+    version: int
+    body: bytes
+    gzip_body: bytes
+    etag: str
+
+
+def table_version(table: str, scope: Optional[str] = None) -> int:
+    """Current version of a tenant's table; bumped after every committed ORM write to it."""
+    return _versions[(scope, table)]
+
+
+def bump_version(table: str, scope: Optional[str] = None):
+    with _lock:
+        _versions[(scope, table)] += 1
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_tables(session, flush_context):
+    """Remember which tables a flush touched until the transaction ends."""
+    changed = session.info.setdefault("changed_tables", set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        changed.add(obj.__table__.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_tables(session):
+    for table in session.info.pop("changed_tables", ()):
+        bump_version(table, session.info.get("tenant"))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_tables(session):
+    session.info.pop("changed_tables", None)
+
+
+class FragmentCache:
+    """
+    Rendered HTML fragments for one list, valid for one version of its table.
+
+    The caller supplies the version, from a source every process shares
+    (the table's latest change journal seq), so a write in any process
+    invalidates the fragment everywhere. Rows are rendered individually and
+    reused across versions by row key, so a write only re-renders the rows
+    it changed.
+    """
+
+    def __init__(self, table: str):
+        self.table = table
+        self._fragment: Optional[CachedFragment] = None
+        self._rows: Dict[Hashable, str] = {}
+
+    def get(self, version: int) -> Optional[CachedFragment]:
+        """The cached fragment, if it was built for this version of the table."""
+        fragment = self._fragment
+        if fragment and fragment.version == version:
+            return fragment
+        return None
+
+    def build(self, rows: Iterable, row_key: Callable, render_row: Callable[[object], str], version: int) -> CachedFragment:
+        """
+        Assemble and cache the fragment from rows, rendering only rows not seen before.
+
+        version must be read before the rows were queried, so a concurrent
+        write leaves the cache stale rather than wrong.
+        """
+        rendered = {}
+        parts = []
+        for row in rows:
+            key = row_key(row)
+            html = self._rows.get(key)
+            if html is None:
+                html = render_row(row)
+            rendered[key] = html
+            parts.append(html)
+        body = "".join(parts).encode()
+        fragment = CachedFragment(
+            version=version,
+            body=body,
+            gzip_body=gzip.compress(body),
+            etag=f'"{hashlib.sha1(body).hexdigest()[:16]}"',
+        )
+        with _lock:
+            # Only keep rows still in the table, so the row cache cannot outgrow it
+            self._rows = rendered
+            self._fragment = fragment
+        return fragment
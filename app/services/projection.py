@@ -1,8 +1,33 @@
+import hashlib
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
 from sqlalchemy.orm import Session
-from typing import List
-from sqlalchemy import func, delete
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Union
+from sqlalchemy import func, delete, or_
 # Constants removed in favor of database-backed settings
-from app.models import ConstructionSource, ConstructionBudget, ConstructionSetting
+from app.models import (
+    ConstructionSource,
+    ConstructionBudget,
+    ConstructionSetting,
+    ConstructionProjectionRun,
+    ConstructionResourceCatalog,
+)
+import app.models as models_module
+
+
+def source_version(*paths) -> str:
+    """Short hash of the given source files."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()[:12]
+
+
+# Changes whenever this module or the models it reads and writes change,
+# so edited projection logic never reuses a stale run
+CODE_VERSION = source_version(__file__, models_module.__file__)
 
 
 def get_setting(db: Session, name: str, default: str) -> str:
@@ -14,10 +39,10 @@ def get_setting(db: Session, name: str, default: str) -> str:
 STATIC_ROWS = [
     ["0916", "PROCEEDS", "2025", "PROJECTED", 80000000.00],
     ["0905", "JPALEASE", "2025", "PROJECTED", 56000000.00],
-    ["0920", "JPALEASE", "2025", "PROJECTED", 500000.00],
+    # 500,000 lease income less a 30,000,000 payment, one row per primary key
+    ["0920", "JPALEASE", "2025", "PROJECTED", -29500000.00],
     ["0920", "JPALEASE", "2026", "PROJECTED", 500000.00],
     ["0920", "JPALEASE", "2027", "PROJECTED", 500000.00],
-    ["0920", "JPALEASE", "2025", "PROJECTED", -30000000.00],
     ["0930", "DEVFEES", "2025", "PROJECTED", 4000000.00],
     ["0930", "DEVFEES", "2026", "PROJECTED", 4000000.00],
     ["0930", "DEVFEES", "2027", "PROJECTED", 4000000.00],
@@ -32,13 +57,37 @@ STATIC_ROWS = [
 
 def clear_sources(db: Session):
     """
-    Remove all projected construction sources from the database.
+    Remove projected rows, a single range on the source index.
+
+    Projected rows are exactly the rows projection runs write, and only the
+    latest run's rows are ever kept, so deleting by source is the per-run
+    delete; run_id records which run wrote a row but needs no index of its own.
     """
     db.execute(delete(ConstructionSource).where(ConstructionSource.flow_source == "PROJECTED"))
     db.commit()
 
 
-def insert_rows(db: Session, rows: List[List]):
+def stored_rows_query(db: Session):
+    """
+    The CONSTRUCTION_SOURCES rows clear_sources keeps, in primary key order.
+
+    These are inputs to the projection alongside the budget and static rows.
+    """
+    return db.query(
+        ConstructionSource.resource,
+        ConstructionSource.flow_type,
+        ConstructionSource.fiscal_year,
+        ConstructionSource.flow_source,
+        ConstructionSource.amount,
+    ).filter(ConstructionSource.flow_source != "PROJECTED").order_by(
+        ConstructionSource.resource,
+        ConstructionSource.flow_type,
+        ConstructionSource.fiscal_year,
+        ConstructionSource.flow_source,
+    )
+
+
+def insert_rows(db: Session, rows: List[List], run_id: int = 0):
     """
     Insert multiple construction source rows into the database.
     """
@@ -49,28 +98,91 @@ def insert_rows(db: Session, rows: List[List]):
             fiscal_year=r[2],
             flow_source=r[3],
             amount=r[4],
+            run_id=run_id,
         ))
     db.commit()
 
 
-def get_budget_rows(db: Session, after_year: str) -> List[List]:
+def insert_rows_batched(db: Session, rows: Iterable[List], batch_size: int = 1000, run_id: int = 0) -> int:
     """
-    Retrieve aggregated budget rows after a given fiscal year.
+    Insert construction source rows from an iterable, flushing every batch_size rows.
+
+    Commits once at the end, so rows can be consumed from a query that is
+    still streaming on the same session. Returns the number of rows inserted.
+    """
+    count = 0
+    for r in rows:
+        db.add(ConstructionSource(
+            resource=r[0],
+            flow_type=r[1],
+            fiscal_year=r[2],
+            flow_source=r[3],
+            amount=r[4],
+            run_id=run_id,
+        ))
+        count += 1
+        if count % batch_size == 0:
+            db.flush()
+    db.commit()
+    return count
+
+
+def budget_rows_query(db: Session, after_year: str):
+    """
+    Build the aggregated budget query after a given fiscal year, ordered by period and program.
+
+    Only program codes active in the resource catalog are included, and only
+    lines in a program's mapped fund when the catalog gives one.
     """
     return db.query(
         ConstructionBudget.budget_period,
         ConstructionBudget.program_code,
         func.sum(ConstructionBudget.monetary_amount)
+    ).join(
+        ConstructionResourceCatalog,
+        ConstructionResourceCatalog.program_code == ConstructionBudget.program_code,
     ).filter(
         ConstructionBudget.budget_period > int(after_year),
-        ConstructionBudget.program_code.in_([
-            '0905', '0910', '0915', '0916', '0917',
-            '0920', '0925', '0930', '0935', '0940', '0945'
-        ])
+        ConstructionResourceCatalog.active.is_(True),
+        or_(
+            ConstructionResourceCatalog.fund_code.is_(None),
+            ConstructionResourceCatalog.fund_code == ConstructionBudget.fund_code,
+        ),
     ).group_by(
         ConstructionBudget.budget_period,
         ConstructionBudget.program_code
-    ).all()
+    ).order_by(
+        ConstructionBudget.budget_period,
+        ConstructionBudget.program_code
+    )
+
+
+def get_budget_rows(db: Session, after_year: str) -> List[List]:
+    """
+    Retrieve aggregated budget rows after a given fiscal year.
+    """
+    return budget_rows_query(db, after_year).all()
+
+
+def stream_budget_rows(db: Session, after_year: str, batch_size: int = 1000) -> Iterator:
+    """
+    Stream aggregated budget rows after a given fiscal year without materializing the result.
+
+    On SQL Server, writing to the session while this is being consumed needs
+    MARS_Connection=Yes in the connection URL.
+    """
+    return iter(budget_rows_query(db, after_year).yield_per(batch_size))
+
+
+def stream_project_costs(budget_rows: Iterable, years: Set[str], resources: Set[str]) -> Iterator[List]:
+    """
+    Yield cost rows from budget rows in one pass, adding every year and resource seen to the given sets.
+    """
+    for r in budget_rows:
+        years.add(str(int(r[0])))
+        resources.add(r[1])
+        if r[2] != 0:
+            yield [r[1], "COSTS", str(r[0]), "PROJECTED", r[2]]
 
 
 def clean_project_costs(rows: List[List]) -> List[List]:
@@ -103,59 +215,183 @@ def list_resources(budget_rows, static_rows):
     ))
 
 
-def get_amount(db: Session, flow_type: str, year: str, resource: str) -> float:
+def get_amount(db: Session, flow_type: str, year: Union[int, str], resource: str) -> float:
     """
     Retrieve the amount for a given flow type, year, and resource.
+
+    When several flow sources match, the lowest one wins.
     """
     row = db.query(ConstructionSource.amount).filter_by(
-        flow_type=flow_type, fiscal_year=year, resource=resource
-    ).first()
+        resource=resource, fiscal_year_num=int(year), flow_type=flow_type
+    ).order_by(ConstructionSource.flow_source).first()
     return row[0] if row else 0.0
 
 
-def calc_interest(db: Session, year: str, resource: str, rate: float):
+def calc_interest(db: Session, year: str, resource: str, rate: float, run_id: int = 0):
     """
     Calculate and insert projected interest for a resource in a given year.
     """
     cost = get_amount(db, "COSTS", year, resource)
-    beg = get_amount(db, "END_EQUITY", str(int(year) - 1), resource)
+    beg = get_amount(db, "END_EQUITY", int(year) - 1, resource)
     proceeds = get_amount(db, "PROCEEDS", year, resource)
     interest = round((((beg + cost + proceeds) + beg) / 2) * rate, -2)
     if interest > 0:
-        insert_rows(db, [[resource, "INTEREST", year, "PROJECTED", interest]])
+        insert_rows(db, [[resource, "INTEREST", year, "PROJECTED", interest]], run_id)
+        return 1
+    return 0
 
 
-def calc_balance(db: Session, year: str, resource: str):
+def calc_balance(db: Session, year: str, resource: str, run_id: int = 0):
     """
     Calculate and insert beginning and ending equity balances for a resource.
     """
-    beg = get_amount(db, "END_EQUITY", str(int(year) - 1), resource)
-    insert_rows(db, [[resource, "BEG_EQUITY", year, "PROJECTED", beg]])
+    beg = get_amount(db, "END_EQUITY", int(year) - 1, resource)
+    insert_rows(db, [[resource, "BEG_EQUITY", year, "PROJECTED", beg]], run_id)
 
     total = db.query(func.sum(ConstructionSource.amount)).filter_by(
-        resource=resource, fiscal_year=year
+        resource=resource, fiscal_year_num=int(year)
     ).scalar() or 0.0
-    insert_rows(db, [[resource, "END_EQUITY", year, "PROJECTED", total]])
+    insert_rows(db, [[resource, "END_EQUITY", year, "PROJECTED", total]], run_id)
+    return 2
+
+
+def projection_fingerprint(
+    budget_rows: Iterable, static_rows, prior_year: str, rate: float, stored_rows: Iterable = (),
+) -> str:
+    """
+    Hash every projection input, plus the code version, into a content fingerprint.
+
+    Budget and stored rows are hashed as they arrive, so they can be streamed;
+    they must come in the order the budget and stored row queries produce.
+    """
+    digest = hashlib.sha256(json.dumps({
+        "static": [list(r) for r in static_rows],
+        "prior_year": prior_year,
+        "rate": rate,
+        "version": CODE_VERSION,
+    }).encode())
+    for r in budget_rows:
+        digest.update(json.dumps([int(r[0]), r[1], r[2]]).encode())
+    # Separates the two streams, so a row cannot move from one to the other unnoticed
+    digest.update(b"stored")
+    for r in stored_rows:
+        digest.update(json.dumps(list(r)).encode())
+    return digest.hexdigest()
+
+
+def get_last_run(db: Session) -> Optional[ConstructionProjectionRun]:
+    """Fetch the most recently started projection run, if any."""
+    return db.query(ConstructionProjectionRun).order_by(ConstructionProjectionRun.id.desc()).first()
 
 
-def run_projection(db: Session) -> str:
-    """Run the full projection, using database settings if available."""
+def start_run(db: Session, fingerprint: str) -> ConstructionProjectionRun:
+    """Record a projection run as running; its id tags every row it writes."""
+    run = ConstructionProjectionRun(fingerprint=fingerprint, status="Running")
+    db.add(run)
+    db.commit()
+    return run
+
+
+def finish_run(db: Session, run: ConstructionProjectionRun, status: str):
+    """Record the outcome of a projection run."""
+    run.status = status
+    db.commit()
+
+
+class ProgressReporter:
+    """
+    Time projection phases and report structured events to an optional callback.
+    """
+
+    def __init__(self, callback: Optional[Callable[[dict], None]] = None):
+        self.callback = callback
+
+    def emit(self, phase: str, status: str, **fields):
+        if self.callback:
+            self.callback({"phase": phase, "status": status, **fields})
+
+    @contextmanager
+    def phase(self, name: str):
+        """Report start and completion of a phase; the yielded dict collects rows_written."""
+        counters = {"rows_written": 0}
+        start = time.perf_counter()
+        self.emit(name, "start")
+        yield counters
+        self.emit(name, "done", elapsed=round(time.perf_counter() - start, 3), **counters)
+
+
+def run_projection(
+    db: Session,
+    force: bool = False,
+    progress: Optional[Callable[[dict], None]] = None,
+    static_rows: Optional[List[List]] = None,
+) -> str:
+    """
+    Run the full projection, using database settings if available.
+
+    Skips the rewrite and returns "Success" when the inputs match the last
+    run and it succeeded, unless force is set. Every row written is tagged
+    with the id of the run that wrote it. Phase events (budget_load, clear,
+    static, write, compute) are passed to progress as they happen. static_rows
+    defaults to STATIC_ROWS.
+    """
+    if static_rows is None:
+        static_rows = STATIC_ROWS
+    reporter = ProgressReporter(progress)
+    run = None
     try:
-        prior_year = get_setting(db, "PRIOR_YEAR", "2024")
-        rate = float(get_setting(db, "INT_RATE", "0.03"))
-        clear_sources(db)
-        insert_rows(db, STATIC_ROWS)
-        budget_rows = get_budget_rows(db, prior_year)
-        insert_rows(db, clean_project_costs(budget_rows))
+        with reporter.phase("budget_load"):
+            prior_year = get_setting(db, "PRIOR_YEAR", "2024")
+            rate = float(get_setting(db, "INT_RATE", "0.03"))
+            fingerprint = projection_fingerprint(
+                stream_budget_rows(db, prior_year), static_rows, prior_year, rate,
+                stored_rows_query(db).yield_per(1000),
+            )
+        last_run = get_last_run(db)
+        if not force and last_run and last_run.fingerprint == fingerprint and last_run.status == "Success":
+            return last_run.status
+
+        run = start_run(db, fingerprint)
+        with reporter.phase("clear"):
+            clear_sources(db)
+        with reporter.phase("static") as counters:
+            insert_rows(db, static_rows, run.id)
+            counters["rows_written"] = len(static_rows)
+        with reporter.phase("write") as counters:
+            # Cost rows are written while the budget query is still streaming
+            year_set = {r[2] for r in static_rows}
+            resource_set = {r[0] for r in static_rows}
+            costs = stream_project_costs(stream_budget_rows(db, prior_year), year_set, resource_set)
+            counters["rows_written"] = insert_rows_batched(db, costs, run_id=run.id)
 
-        years = list_years(budget_rows, STATIC_ROWS)
-        resources = list_resources(budget_rows, STATIC_ROWS)
+        years = sorted(year_set)
+        resources = sorted(resource_set)
 
-        for res in resources:
-            for yr in years:
-                calc_interest(db, yr, res, rate)
-                calc_balance(db, yr, res)
+        with reporter.phase("compute") as counters:
+            start = time.perf_counter()
+            total = len(resources) * len(years)
+            step = 0
+            for res in resources:
+                for yr in years:
+                    counters["rows_written"] += calc_interest(db, yr, res, rate, run.id)
+                    counters["rows_written"] += calc_balance(db, yr, res, run.id)
+                    step += 1
+                    reporter.emit(
+                        "compute", "progress",
+                        resource=res, year=yr, step=step, total=total,
+                        rows_written=counters["rows_written"],
+                        elapsed=round(time.perf_counter() - start, 3),
+                    )
 
+        finish_run(db, run, "Success")
         return "Success"
     except Exception as e:
-        return f"Failed: {str(e)}"
+        status = f"Failed: {str(e)}"
+        if run is not None:
+            try:
+                db.rollback()
+                finish_run(db, run, status[:255])
+            except Exception:
+                # The original error is the one worth reporting
+                pass
+        return status
@@ -0,0 +1,69 @@
+import hashlib
+import math
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Changes whenever this module changes, for caches keyed on engine output
+ENGINE_VERSION = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:12]
+
+
+class SourceTable:
+    """
+    In-memory stand-in for CONSTRUCTION_SOURCES with the same lookup semantics.
+
+    Lookups return the row with the lowest flow_source for a (resource,
+    flow_type, fiscal_year) key, matching the primary key order the database
+    returns first; totals sum every row for a (resource, fiscal_year).
+    """
+
+    def __init__(self):
+        self.rows: List[List] = []
+        self._first: Dict[Tuple[str, str, str], Tuple[str, float]] = {}
+        self._by_year: Dict[Tuple[str, str], List[float]] = defaultdict(list)
+
+    def add(self, row: List):
+        resource, flow_type, year, flow_source, amount = row
+        self.rows.append(row)
+        key = (resource, flow_type, year)
+        if key not in self._first or flow_source < self._first[key][0]:
+            self._first[key] = (flow_source, amount)
+        self._by_year[(resource, year)].append(amount)
+
+    def amount(self, flow_type: str, year: str, resource: str) -> float:
+        found = self._first.get((resource, flow_type, year))
+        return found[1] if found else 0.0
+
+    def total(self, resource: str, year: str) -> float:
+        return math.fsum(self._by_year.get((resource, year), []))
+
+
+def project_sources(base_rows: List[List], years: List[str], resources: List[str], rate: float) -> List[List]:
+    """
+    Run the interest and balance recurrence of calc_interest/calc_balance in memory.
+
+    base_rows are the rows present before the loop (existing non-projected
+    rows, static rows and cost rows). Returns the INTEREST, BEG_EQUITY and
+    END_EQUITY rows the database loop would insert, in the same order.
+    """
+    table = SourceTable()
+    for r in base_rows:
+        table.add(list(r))
+    generated = []
+
+    def insert(row):
+        table.add(row)
+        generated.append(row)
+
+    for res in resources:
+        for yr in years:
+            prior = str(int(yr) - 1)
+            cost = table.amount("COSTS", yr, res)
+            beg = table.amount("END_EQUITY", prior, res)
+            proceeds = table.amount("PROCEEDS", yr, res)
+            interest = round((((beg + cost + proceeds) + beg) / 2) * rate, -2)
+            if interest > 0:
+                insert([res, "INTEREST", yr, "PROJECTED", interest])
+            insert([res, "BEG_EQUITY", yr, "PROJECTED", beg])
+            insert([res, "END_EQUITY", yr, "PROJECTED", table.total(res, yr)])
+    return generated
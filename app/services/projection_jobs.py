@@ -0,0 +1,165 @@
+import asyncio
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.services.projection import run_projection
+
+# Finished jobs are kept so late or reconnecting subscribers can replay them
+MAX_JOBS = 20
+
+PHASES = ["budget_load", "clear", "static", "write", "compute"]
+
+def _fold(summary: Dict[str, dict], event: dict):
+    summary.setdefault(event["phase"], {"phase": event["phase"]}).update(event)
+
+
+def _empty_summary() -> Dict[str, dict]:
+    return {name: {"phase": name, "status": "pending"} for name in PHASES}
+
+
+class ProjectionJob:
+    """
+    A projection running in a background thread, with its progress event log.
+
+    The per-phase summary is kept up to date as events arrive, so subscribers
+    never refold the whole log. Async subscribers wait on an asyncio event
+    set from the worker thread, so watching progress holds no thread.
+    """
+
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.events: List[dict] = []
+        self.status: Optional[str] = None
+        # When the projection's writes were committed, for read-your-writes pinning
+        self.finished_at: Optional[float] = None
+        self._summary = _empty_summary()
+        self._changed = threading.Condition()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+    @property
+    def done(self) -> bool:
+        return self.status is not None
+
+    def _notify(self):
+        self._changed.notify_all()
+        for loop, event in self._waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The subscriber's loop has closed
+                pass
+        self._waiters.clear()
+
+    def publish(self, event: dict):
+        with self._changed:
+            self.events.append(event)
+            _fold(self._summary, event)
+            self._notify()
+
+    def finish(self, status: str):
+        with self._changed:
+            self.status = status
+            self.finished_at = time.time()
+            self._notify()
+
+    def summary(self) -> List[dict]:
+        """The current one-row-per-phase progress summary."""
+        with self._changed:
+            return [dict(row) for row in self._summary.values()]
+
+    async def wait_async(self, after: int, timeout: float) -> Tuple[int, bool]:
+        """
+        Wait, without blocking a thread, until events past index after exist or the job finishes.
+
+        Returns the event count and whether the job has finished.
+        """
+        ready = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), ready)
+        with self._changed:
+            if len(self.events) > after or self.done:
+                return len(self.events), self.done
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._changed:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        with self._changed:
+            return len(self.events), self.done
+
+    def result(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Block until the job finishes and return its status."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.done, timeout)
+            return self.status
+
+
+class JobQueue:
+    """
+    Projection jobs for one tenant, run one at a time on a worker thread.
+
+    Each tenant has its own queue and job history, so a long projection or a
+    burst of jobs for one tenant never delays or evicts another tenant's.
+    """
+
+    def __init__(self, name: str = "default", max_jobs: int = MAX_JOBS):
+        self.name = name
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, ProjectionJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending: "queue.Queue[Callable[[], None]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    def _run(self):
+        while True:
+            self._pending.get()()
+
+    def start(
+        self,
+        session_factory: Callable[[], Session],
+        force: bool = False,
+        static_rows: Optional[List[List]] = None,
+    ) -> ProjectionJob:
+        """Queue a projection and return its job handle."""
+        job = ProjectionJob(uuid.uuid4().hex)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name=f"projection-{self.name}", daemon=True)
+                self._worker.start()
+
+        def target():
+            status = "Failed: projection job did not complete"
+            try:
+                db = session_factory()
+                try:
+                    status = run_projection(db, force=force, progress=job.publish, static_rows=static_rows)
+                finally:
+                    db.close()
+            except Exception as e:
+                status = f"Failed: {str(e)}"
+            finally:
+                job.finish(status)
+
+        self._pending.put(target)
+        return job
+
+    def get(self, job_id: str) -> Optional[ProjectionJob]:
+        """Look up a recent projection job by id."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+# Queue for the default tenant and callers outside a tenant context
+default_queue = JobQueue()
@@ -0,0 +1,103 @@
+import os
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db import get_engine
+from app.models import ConstructionSource
+
+RECONCILED_FLOW_TYPES = ["END_EQUITY", "INTEREST", "COSTS"]
+KEY_COLUMNS = ["resource", "fiscal_year", "flow_type"]
+
+# PS_ACTUALS_SQL must return resource, fiscal_year, flow_type and amount for
+# :start_year..:end_year. Account mappings differ between ledgers, so there is
+# no default; END_EQUITY must be the closing balance, not the period's activity.
+ACTUALS_SQL_SETTING = "PS_ACTUALS_SQL"
+
+
+class ReconciliationUnavailable(RuntimeError):
+    """Raised when the ledger connection or actuals query is not configured."""
+
+
+def actuals_sql() -> str:
+    sql = os.getenv(ACTUALS_SQL_SETTING)
+    if not sql:
+        raise ReconciliationUnavailable(
+            f"{ACTUALS_SQL_SETTING} is not set; configure the ledger actuals query to reconcile"
+        )
+    return sql
+
+
+def ledger_engine() -> Engine:
+    """The PeopleSoft ledger engine."""
+    if not os.getenv("PS_DB_URL"):
+        raise ReconciliationUnavailable("PS_DB_URL is not set; configure the ledger connection to reconcile")
+    return get_engine("ps")
+
+
+def load_actuals(ps_engine: Engine, start_year: int, end_year: int) -> pd.DataFrame:
+    """
+    Pull ledger actuals for the whole year range in one aggregated query.
+    """
+    sql = actuals_sql()
+    with ps_engine.connect() as conn:
+        actuals = pd.read_sql(text(sql), conn, params={"start_year": start_year, "end_year": end_year})
+    actuals = actuals.astype({"resource": str, "fiscal_year": int, "flow_type": str, "amount": float})
+    return actuals.groupby(KEY_COLUMNS, as_index=False)["amount"].sum()
+
+
+def load_projection(db: Session, start_year: int, end_year: int) -> pd.DataFrame:
+    """
+    Load projected END_EQUITY, INTEREST and COSTS for the year range.
+    """
+    rows = db.query(
+        ConstructionSource.resource,
+        ConstructionSource.fiscal_year,
+        ConstructionSource.flow_type,
+        ConstructionSource.amount,
+    ).filter(
+        ConstructionSource.flow_source == "PROJECTED",
+        ConstructionSource.flow_type.in_(RECONCILED_FLOW_TYPES),
+        ConstructionSource.fiscal_year_num.between(start_year, end_year),
+    ).all()
+    projection = pd.DataFrame(rows, columns=KEY_COLUMNS + ["amount"]).astype({"fiscal_year": int, "amount": float})
+    return projection.groupby(KEY_COLUMNS, as_index=False)["amount"].sum()
+
+
+def reconcile(projection: pd.DataFrame, actuals: pd.DataFrame, abs_threshold: float, pct_threshold: float) -> pd.DataFrame:
+    """
+    Join projection and actuals on (resource, fiscal_year, flow_type) and measure variances.
+
+    A side with no row counts as zero. A variance is flagged when it reaches
+    abs_threshold and its ratio to the projection reaches pct_threshold (any
+    variance against a zero projection passes the ratio test).
+    """
+    merged = projection.rename(columns={"amount": "projected"}).merge(
+        actuals.rename(columns={"amount": "actual"}), on=KEY_COLUMNS, how="outer",
+    )
+    merged[["projected", "actual"]] = merged[["projected", "actual"]].fillna(0.0)
+    merged["variance"] = merged["actual"] - merged["projected"]
+    merged["pct_variance"] = merged["variance"] / merged["projected"].abs().where(merged["projected"] != 0)
+    merged["flagged"] = (merged["variance"].abs() >= abs_threshold) & (
+        merged["pct_variance"].isna() | (merged["pct_variance"].abs() >= pct_threshold)
+    )
+    return merged.sort_values(KEY_COLUMNS).reset_index(drop=True)
+
+
+def run_reconciliation(
+    db: Session,
+    ps_engine: Engine,
+    start_year: int,
+    end_year: int,
+    abs_threshold: float,
+    pct_threshold: float,
+) -> pd.DataFrame:
+    """Reconcile the stored projection against ledger actuals for a year range."""
+    return reconcile(
+        load_projection(db, start_year, end_year),
+        load_actuals(ps_engine, start_year, end_year),
+        abs_threshold,
+        pct_threshold,
+    )
@@ -0,0 +1,84 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.constants import DEFAULT_PROGRAM_CODES
+from app.models import ConstructionResourceCatalog
+from app.services.fragment_cache import table_version
+
+# Catalog edits made outside this process are picked up after this long
+SNAPSHOT_TTL_SECONDS = 300.0
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    codes: FrozenSet[str]
+    ordered: Tuple[str, ...]
+    version: int
+    loaded_at: float
+
+
+_lock = threading.Lock()
+# One snapshot per tenant scope (None is the default database)
+_snapshots: Dict[Optional[str], CatalogSnapshot] = {}
+
+
+def _current_scope() -> Optional[str]:
+    from app.db import current_tenant
+
+    tenant = current_tenant.get()
+    return tenant.scope if tenant else None
+
+
+def seed_catalog(db: Session, codes=DEFAULT_PROGRAM_CODES):
+    """Add active catalog entries for program codes, in the given display order."""
+    db.add_all([
+        ConstructionResourceCatalog(program_code=code, active=True, display_order=i)
+        for i, code in enumerate(codes)
+    ])
+    db.commit()
+
+
+def load_catalog(db: Session) -> CatalogSnapshot:
+    """Read the active program codes in display order."""
+    version = table_version(ConstructionResourceCatalog.__tablename__, db.info.get("tenant"))
+    codes = tuple(
+        r.program_code for r in db.query(ConstructionResourceCatalog.program_code)
+        .filter(ConstructionResourceCatalog.active.is_(True))
+        .order_by(ConstructionResourceCatalog.display_order, ConstructionResourceCatalog.program_code)
+    )
+    return CatalogSnapshot(frozenset(codes), codes, version, time.monotonic())
+
+
+def catalog_snapshot(db: Session) -> CatalogSnapshot:
+    """
+    The current tenant's cached catalog, reloaded through db after a catalog write or once the TTL expires.
+    """
+    scope = _current_scope()
+    snapshot = _snapshots.get(scope)
+    if (
+        snapshot is not None
+        and snapshot.version == table_version(ConstructionResourceCatalog.__tablename__, scope)
+        and time.monotonic() - snapshot.loaded_at < SNAPSHOT_TTL_SECONDS
+    ):
+        return snapshot
+    with _lock:
+        _snapshots[scope] = snapshot = load_catalog(db)
+        return snapshot
+
+
+def is_active_code(db: Session, program_code: str) -> bool:
+    """Whether program_code is active in the current tenant's catalog."""
+    return program_code in catalog_snapshot(db).codes
+
+
+def set_catalog_snapshot(snapshot: Optional[CatalogSnapshot]):
+    """Replace the current tenant's cached snapshot; None forces a reload."""
+    scope = _current_scope()
+    if snapshot is None:
+        _snapshots.pop(scope, None)
+    else:
+        _snapshots[scope] = snapshot
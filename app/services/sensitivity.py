@@ -0,0 +1,189 @@
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.services.projection import (
+    STATIC_ROWS,
+    budget_rows_query,
+    clean_project_costs,
+    get_setting,
+    list_resources,
+    list_years,
+    stored_rows_query,
+)
+
+# What a solve can vary: the interest rate, or an extra amount added every projected year
+PARAMETERS = ["INT_RATE", "DEVFEES", "PROCEEDS"]
+DEFAULT_BOUNDS = {
+    "INT_RATE": (0.0, 0.25),
+    "DEVFEES": (0.0, 1_000_000_000.0),
+    "PROCEEDS": (0.0, 1_000_000_000.0),
+}
+DEFAULT_TOLERANCE = {"INT_RATE": 1e-6, "DEVFEES": 1.0, "PROCEEDS": 1.0}
+
+
+@dataclass
+class RecurrenceInputs:
+    """
+    Per (resource, year) inputs to the interest and balance recurrence.
+
+    Arrays are shaped (resources, years). beg_fixed holds the prior year's
+    END_EQUITY where it does not come from the projection itself (a stored
+    row, or zero), and NaN where it is the previous projected year's result.
+    """
+    resources: List[str]
+    years: List[str]
+    rate: float
+    cost: np.ndarray
+    proceeds: np.ndarray
+    base_total: np.ndarray
+    beg_fixed: np.ndarray
+
+
+def build_inputs(base_rows: List[List], years: List[str], resources: List[str], rate: float) -> RecurrenceInputs:
+    """
+    Reduce the rows present before the loop to the arrays the recurrence reads.
+
+    Lookups follow SourceTable: the lowest flow_source wins, and a stored
+    END_EQUITY beats a projected one unless it sorts after "PROJECTED".
+    """
+    first: Dict[Tuple[str, str, str], Tuple[str, float]] = {}
+    by_year: Dict[Tuple[str, str], List[float]] = defaultdict(list)
+    for resource, flow_type, year, flow_source, amount in base_rows:
+        key = (resource, flow_type, year)
+        if key not in first or flow_source < first[key][0]:
+            first[key] = (flow_source, amount)
+        by_year[(resource, year)].append(amount)
+
+    def lookup(flow_type, year, resource):
+        found = first.get((resource, flow_type, year))
+        return found[1] if found else 0.0
+
+    shape = (len(resources), len(years))
+    cost, proceeds, base_total = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+    beg_fixed = np.full(shape, np.nan)
+    projected = set(years)
+    for i, res in enumerate(resources):
+        for j, yr in enumerate(years):
+            prior = str(int(yr) - 1)
+            cost[i, j] = lookup("COSTS", yr, res)
+            proceeds[i, j] = lookup("PROCEEDS", yr, res)
+            base_total[i, j] = math.fsum(by_year.get((res, yr), []))
+            stored = first.get((res, "END_EQUITY", prior))
+            if prior not in projected:
+                beg_fixed[i, j] = stored[1] if stored else 0.0
+            elif stored and stored[0] <= "PROJECTED":
+                beg_fixed[i, j] = stored[1]
+    return RecurrenceInputs(resources, years, rate, cost, proceeds, base_total, beg_fixed)
+
+
+def load_inputs(db: Session, static_rows: Optional[List[List]] = None) -> RecurrenceInputs:
+    """Read the same inputs run_projection would use, without writing anything."""
+    if static_rows is None:
+        static_rows = STATIC_ROWS
+    prior_year = get_setting(db, "PRIOR_YEAR", "2024")
+    rate = float(get_setting(db, "INT_RATE", "0.03"))
+    budget = [tuple(r) for r in budget_rows_query(db, prior_year)]
+    stored = [list(r) for r in stored_rows_query(db)]
+    base_rows = stored + [list(r) for r in static_rows] + clean_project_costs(budget)
+    return build_inputs(base_rows, list_years(budget, static_rows), list_resources(budget, static_rows), rate)
+
+
+def end_equity(inputs: RecurrenceInputs, rate=None, devfees=0.0, proceeds=0.0) -> np.ndarray:
+    """
+    Projected END_EQUITY for many candidate values at once.
+
+    rate, devfees and proceeds broadcast against (candidates, resources);
+    devfees and proceeds are extra amounts added in every projected year.
+    Returns an array shaped (candidates, resources, years).
+    """
+    rate = np.asarray(inputs.rate if rate is None else rate, dtype=float)
+    devfees = np.asarray(devfees, dtype=float)
+    proceeds = np.asarray(proceeds, dtype=float)
+    shape = np.broadcast_shapes(rate.shape, devfees.shape, proceeds.shape, (1, len(inputs.resources)))
+    ends = np.zeros(shape + (len(inputs.years),))
+    prev_end = np.zeros(shape)
+    for j in range(len(inputs.years)):
+        fixed = inputs.beg_fixed[:, j]
+        beg = np.where(np.isnan(fixed), prev_end, fixed)
+        year_proceeds = inputs.proceeds[:, j] + proceeds
+        interest = np.round((((beg + inputs.cost[:, j] + year_proceeds) + beg) / 2) * rate, -2)
+        interest = np.where(interest > 0, interest, 0.0)
+        prev_end = inputs.base_total[:, j] + devfees + proceeds + interest + beg
+        ends[..., j] = prev_end
+    return ends
+
+
+def _feasible(inputs: RecurrenceInputs, parameter: str, values: np.ndarray, through: np.ndarray) -> np.ndarray:
+    """Whether every END_EQUITY through the horizon is non-negative, per candidate and resource."""
+    if parameter == "INT_RATE":
+        ends = end_equity(inputs, rate=values)
+    else:
+        ends = end_equity(inputs, **{parameter.lower(): values})
+    return np.where(through, ends >= 0, True).all(axis=-1)
+
+
+def solve_break_even(
+    inputs: RecurrenceInputs,
+    parameter: str,
+    through_year: int = 2030,
+    lower: Optional[float] = None,
+    upper: Optional[float] = None,
+    points: int = 2001,
+    tolerance: Optional[float] = None,
+) -> List[dict]:
+    """
+    Find, per resource, the smallest parameter value that keeps END_EQUITY non-negative through through_year.
+
+    END_EQUITY only grows with each parameter, so a grid over [lower, upper]
+    brackets the break-even point and a bisection refines it to tolerance,
+    every resource at once. status is "solved", "already_met" when lower
+    suffices, or "not_met" when even upper falls short.
+    """
+    if parameter not in PARAMETERS:
+        raise ValueError(f"parameter must be one of {', '.join(PARAMETERS)}")
+    default_lower, default_upper = DEFAULT_BOUNDS[parameter]
+    lower = default_lower if lower is None else lower
+    upper = default_upper if upper is None else upper
+    tolerance = DEFAULT_TOLERANCE[parameter] if tolerance is None else tolerance
+    if lower >= upper:
+        raise ValueError("lower must be below upper")
+    through = np.array([int(y) <= through_year for y in inputs.years])
+
+    grid = np.linspace(lower, upper, max(points, 2))
+    feasible = _feasible(inputs, parameter, grid[:, None], through)
+    any_feasible = feasible.any(axis=0)
+    first = feasible.argmax(axis=0)
+
+    # Bisect between the last failing and first passing grid points
+    hi = grid[first]
+    lo = grid[np.maximum(first - 1, 0)]
+    active = any_feasible & (first > 0)
+    while active.any() and (hi - lo)[active].max() > tolerance:
+        mid = (lo + hi) / 2
+        ok = _feasible(inputs, parameter, mid[None, :], through)[0]
+        hi = np.where(active & ok, mid, hi)
+        lo = np.where(active & ~ok, mid, lo)
+
+    baseline = end_equity(inputs)[0]
+    results = []
+    for i, res in enumerate(inputs.resources):
+        if not any_feasible[i]:
+            status, value = "not_met", None
+        elif first[i] == 0:
+            status, value = "already_met", float(lower)
+        else:
+            status, value = "solved", float(hi[i])
+        horizon = baseline[i][through]
+        results.append({
+            "resource": res,
+            "parameter": parameter,
+            "status": status,
+            "break_even": value,
+            "baseline_min_end_equity": float(horizon.min()) if horizon.size else None,
+        })
+    return results
@@ -0,0 +1,12 @@
+from fastapi.templating import Jinja2Templates
+
+# One environment for every UI module, so each template is compiled once per process
+templates = Jinja2Templates(directory="app/templates")
+
+
+def precompile_templates() -> int:
+    """Compile every template into the environment's cache; returns how many were loaded."""
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.get_template(name)
+    return len(names)
@@ -0,0 +1,267 @@
+import asyncio
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+
+from fastapi.responses import JSONResponse
+from sqlalchemy import create_engine
+
+import app.db as db_module
+from app.config import PASSPHRASE
+from app.db import LazySessionMaker, current_tenant
+from app.models import ConstructionStaticRow
+from app.services.change_journal import latest_sequence
+from app.services.fragment_cache import FragmentCache
+from app.services.projection_jobs import JobQueue, default_queue
+
+# JSON file describing tenants beyond the one configured by DATABASE_URL
+TENANTS_FILE = os.getenv("TENANTS_FILE")
+# Tenant for requests that name none; defaults to "default", or the first file tenant without DATABASE_URL
+DEFAULT_TENANT = os.getenv("DEFAULT_TENANT")
+TENANT_HEADER = "x-tenant"
+# Client addresses (e.g. the load balancer) whose X-Tenant header may pick any tenant
+TRUSTED_PROXIES = frozenset(filter(None, (a.strip() for a in os.getenv("TRUSTED_PROXIES", "").split(","))))
+
+
+@dataclass
+class TenantConfig:
+    name: str
+    database_url: Optional[str] = None
+    read_database_url: Optional[str] = None
+    # Required for every tenant but the one configured by DATABASE_URL, which uses PASSPHRASE
+    passphrase: Optional[str] = None
+    # Host names routed to this tenant
+    hosts: List[str] = field(default_factory=list)
+    pool_size: int = 5
+    # Requests handled at once; further requests wait without holding a worker thread
+    max_concurrency: int = 20
+    # Entries in the tenant's LRU cache
+    cache_entries: int = 64
+    # Project from the tenant's CONSTRUCTION_STATIC_ROWS instead of the built-in STATIC_ROWS
+    static_rows_from_table: bool = False
+
+
+class LRUCache:
+    """A bounded, thread-safe mapping that evicts the least recently used entry."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: Hashable, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], object]):
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.put(key, value)
+        return value
+
+
+class Tenant:
+    """
+    One district or entity: its engines and sessions, caches and projection queue.
+
+    The default tenant reuses app.db's sessions, so code that runs outside a
+    request (CLI, tests) sees the same database as its requests.
+    """
+
+    def __init__(self, config: TenantConfig, default: bool = False):
+        self.config = config
+        self.name = config.name
+        self.default = default
+        # Cache versions and session.info are keyed by scope; None is app.db's database
+        self.scope = None if default else config.name
+        self.cache = LRUCache(config.cache_entries)
+        self.jobs = default_queue if default else JobQueue(config.name)
+        self._limiter: Optional[asyncio.Semaphore] = None
+        if default:
+            self.SessionLocal = db_module.SessionLocal
+            self.ReadSessionLocal = db_module.ReadSessionLocal
+        else:
+            info = {"tenant": self.scope}
+            self.SessionLocal = LazySessionMaker(lambda: self.primary_engine, info=info)
+            self.ReadSessionLocal = LazySessionMaker(lambda: self.read_engine, info=info)
+
+    @property
+    def passphrase(self) -> str:
+        return self.config.passphrase
+
+    @cached_property
+    def primary_engine(self):
+        if self.default:
+            return db_module.get_primary_engine()
+        if not self.config.database_url:
+            raise RuntimeError(f"Tenant {self.name} has no database_url")
+        return create_engine(self.config.database_url, pool_size=self.config.pool_size)
+
+    @cached_property
+    def read_engine(self):
+        if self.default:
+            return db_module.get_read_engine()
+        if not self.config.read_database_url:
+            return self.primary_engine
+        return create_engine(self.config.read_database_url, pool_size=self.config.pool_size)
+
+    def fragment_cache(self, table: str) -> FragmentCache:
+        """The tenant's cached HTML list for a table."""
+        return self.cache.get_or_create(("fragment", table), lambda: FragmentCache(table))
+
+    def static_rows(self) -> Optional[List[List]]:
+        """Static rows to project with; None means the built-in STATIC_ROWS."""
+        if not self.config.static_rows_from_table:
+            return None
+        # Versioned by the journal on the primary, so edits made by any process are seen
+        db = self.SessionLocal()
+        try:
+            version = latest_sequence(db, ConstructionStaticRow.__tablename__)
+            # One entry, replaced when the table's version moves on
+            cached = self.cache.get("static_rows")
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            rows = [
+                [r.resource, r.flow_type, r.fiscal_year, r.flow_source, r.amount]
+                for r in db.query(ConstructionStaticRow).order_by(ConstructionStaticRow.id)
+            ]
+        finally:
+            db.close()
+        self.cache.put("static_rows", (version, rows))
+        return rows
+
+    @property
+    def limiter(self) -> Optional[asyncio.Semaphore]:
+        if self._limiter is None and self.config.max_concurrency > 0:
+            self._limiter = asyncio.Semaphore(self.config.max_concurrency)
+        return self._limiter
+
+
+def load_tenant_configs(path: Optional[str] = TENANTS_FILE) -> List[TenantConfig]:
+    """
+    Read tenant configs from a JSON object of name -> settings.
+
+    String values may reference environment variables as $NAME, so secrets
+    can stay out of the file.
+    """
+    if not path:
+        return []
+    with open(path) as f:
+        raw = json.load(f)
+    return [
+        TenantConfig(name=name, **{k: os.path.expandvars(v) if isinstance(v, str) else v for k, v in settings.items()})
+        for name, settings in raw.items()
+    ]
+
+
+class TenantRegistry:
+    def __init__(self, configs: List[TenantConfig], default_name: Optional[str] = DEFAULT_TENANT):
+        self.tenants: Dict[str, Tenant] = {}
+        # Without a tenants file the service is single-tenant, exactly as before
+        if db_module.DATABASE_URL or not configs:
+            self.tenants["default"] = Tenant(TenantConfig(name="default", passphrase=PASSPHRASE), default=True)
+        for config in configs:
+            # A shared passphrase would let one tenant's users run another's projections
+            if not config.passphrase:
+                raise ValueError(f"Tenant {config.name} has no passphrase")
+            self.tenants[config.name] = Tenant(config)
+        self.default = self.tenants[default_name] if default_name else next(iter(self.tenants.values()))
+        self._hosts = {host.lower(): t for t in self.tenants.values() for host in t.config.hosts}
+
+    def resolve(self, name: Optional[str], host: Optional[str], trusted: bool = False) -> Optional[Tenant]:
+        """
+        Pick a tenant by host, falling back to the default tenant.
+
+        An X-Tenant name is honoured from a trusted proxy; from anyone else
+        it must name the host's tenant. None for an unknown or mismatched name.
+        """
+        tenant = self._hosts.get(host.split(":")[0].lower()) if host else None
+        tenant = tenant or self.default
+        if name and trusted:
+            return self.tenants.get(name)
+        if name and name != tenant.name:
+            return None
+        return tenant
+
+
+@lru_cache(maxsize=None)
+def get_registry() -> TenantRegistry:
+    return TenantRegistry(load_tenant_configs())
+
+
+def current() -> Tenant:
+    """The tenant serving this request, or the default tenant outside one."""
+    return current_tenant.get() or get_registry().default
+
+
+class TenantMiddleware:
+    """
+    Route each request to its tenant by Host, or by X-Tenant from a trusted proxy.
+
+    The tenant is visible to dependencies through app.db.current_tenant. A
+    tenant's requests beyond max_concurrency wait here, before taking a
+    worker thread, until one of its earlier requests starts responding.
+    """
+
+    def __init__(
+        self,
+        app,
+        registry: Optional[Callable[[], TenantRegistry]] = None,
+        trusted_proxies: Iterable[str] = TRUSTED_PROXIES,
+    ):
+        self.app = app
+        self.registry = registry or get_registry
+        self.trusted_proxies = frozenset(trusted_proxies)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        client = scope.get("client")
+        trusted = client is not None and client[0] in self.trusted_proxies
+        tenant = self.registry().resolve(headers.get(TENANT_HEADER), headers.get("host"), trusted)
+        if tenant is None:
+            response = JSONResponse({"detail": "Unknown tenant"}, status_code=404)
+            return await response(scope, receive, send)
+
+        token = current_tenant.set(tenant)
+        limiter = tenant.limiter
+        released = limiter is None
+        if limiter is not None:
+            await limiter.acquire()
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                limiter.release()
+
+        async def send_and_release(message):
+            # Streaming responses should not hold a slot after they start
+            if message["type"] == "http.response.start":
+                release()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_release)
+        finally:
+            release()
+            current_tenant.reset(token)
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import ExitStack
+
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+from starlette.concurrency import run_in_threadpool
+
+from app.db import current_tenant
+from app.templating import precompile_templates
+from app.tenants import get_registry
+
+logger = logging.getLogger(__name__)
+
+# Connections opened per engine before the first request
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", "5"))
+# Delay before the first retry of a failed warmup, doubled per attempt up to the maximum
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "2"))
+WARMUP_RETRY_MAX_SECONDS = float(os.getenv("WARMUP_RETRY_MAX_SECONDS", "60"))
+
+
+def open_pool_connections(engine, count: int = WARMUP_CONNECTIONS) -> int:
+    """Open count connections at once and return them to the pool, so requests reuse them."""
+    if isinstance(engine.pool, QueuePool):
+        count = min(count, engine.pool.size())
+    with ExitStack() as stack:
+        for _ in range(count):
+            stack.enter_context(engine.connect()).execute(text("SELECT 1"))
+    return count
+
+
+def prime_caches(tenant):
+    """Build a tenant's cached settings and static row lists and its program catalog."""
+    from app.routes import settings_ui, static_rows_ui
+    from app.services.resource_catalog import catalog_snapshot
+
+    token = current_tenant.set(tenant)
+    try:
+        # Fragments are built from the primary, like the list routes build them
+        db = tenant.SessionLocal()
+        try:
+            settings_ui.list_fragment(db)
+            static_rows_ui.list_fragment(db)
+            catalog_snapshot(db)
+        finally:
+            db.close()
+    finally:
+        current_tenant.reset(token)
+
+
+def warmup() -> dict:
+    """
+    Do the first-request work up front: compile templates, fill the pools and prime caches.
+
+    Every tenant in the registry is warmed through its own engines, so a
+    deployment configured only by a tenants file needs no DATABASE_URL.
+    Steps for tenants other than app.db's are prefixed with the tenant's
+    name. Returns the seconds spent on each step.
+    """
+    timings = {}
+
+    def step(name, func, *args):
+        start = time.perf_counter()
+        func(*args)
+        timings[name] = round(time.perf_counter() - start, 3)
+
+    step("templates", precompile_templates)
+    tenants = get_registry().tenants.values()
+    for tenant in tenants:
+        prefix = "" if tenant.default else f"{tenant.name}_"
+        step(f"{prefix}primary_pool", open_pool_connections, tenant.primary_engine)
+        if tenant.read_engine is not tenant.primary_engine:
+            step(f"{prefix}read_pool", open_pool_connections, tenant.read_engine)
+    for tenant in tenants:
+        step("caches" if tenant.default else f"{tenant.name}_caches", prime_caches, tenant)
+    return timings
+
+
+def try_warmup(app) -> bool:
+    """Run warmup, recording the outcome on app.state; a failure leaves the app not ready."""
+    try:
+        app.state.warmup = warmup()
+    except Exception:
+        logger.exception("Startup warmup failed")
+        app.state.warmup = None
+    return app.state.warmup is not None
+
+
+async def retry_warmup(app):
+    """
+    Retry a failed startup warmup in the background, backing off between attempts, until it succeeds.
+
+    Started once from the lifespan, so readiness probes only report
+    app.state.warmup and never run warmup themselves.
+    """
+    delay = WARMUP_RETRY_SECONDS
+    while True:
+        await asyncio.sleep(delay)
+        if await run_in_threadpool(try_warmup, app):
+            return
+        delay = min(delay * 2, WARMUP_RETRY_MAX_SECONDS)
+
+
+def database_available() -> bool:
+    """Whether every tenant's primary database answers a trivial query."""
+    try:
+        for tenant in get_registry().tenants.values():
+            with tenant.primary_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        return True
+    except Exception:
+        logger.exception("Database readiness check failed")
+        return False
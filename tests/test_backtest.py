@@ -0,0 +1,88 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models import ConstructionBudget, ConstructionSource
+import app.services.backtest as backtest_service
+from app.services.backtest import project_as_of, run_backtest
+from app.services.resource_catalog import seed_catalog
+
+
+@pytest.fixture
+def db_session(monkeypatch):
+    monkeypatch.setattr(backtest_service, "STATIC_ROWS", [
+        ["0916", "PROCEEDS", "2025", "PROJECTED", 1_000_000.0],
+    ])
+    monkeypatch.setattr(backtest_service, "_caches", backtest_service.defaultdict(backtest_service.OrderedDict))
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    seed_catalog(db)
+    for period, amount in [(2023, -100_000.0), (2024, -200_000.0), (2025, -300_000.0)]:
+        db.add(ConstructionBudget(
+            budget_period=period, fund_code="F", program_code="0916",
+            project_id="P", activity_id="A", line_descr="", monetary_amount=amount,
+        ))
+    for year, flow_type, amount in [
+        ("2022", "END_EQUITY", 2_000_000.0),
+        ("2023", "END_EQUITY", 1_950_000.0),
+        ("2023", "INTEREST", 58_000.0),
+        ("2024", "END_EQUITY", 1_800_000.0),
+    ]:
+        db.add(ConstructionSource(
+            resource="0916", flow_type=flow_type, fiscal_year=year, flow_source="ACTUAL", amount=amount,
+        ))
+    db.commit()
+    return db
+
+
+def test_project_as_of_uses_only_known_actuals():
+    budget = [(2023, "0916", -100.0), (2024, "0916", -200.0)]
+    actuals = [
+        ["0916", "END_EQUITY", "2022", "ACTUAL", 1000.0],
+        ["0916", "END_EQUITY", "2023", "ACTUAL", 9999.0],
+    ]
+    rows = project_as_of(2022, budget, [], actuals, 0.0)
+    end = {r[2]: r[4] for r in rows if r[1] == "END_EQUITY"}
+    # 2023 starts from the 2022 actual; the 2023 actual is in the future
+    assert end["2023"] == 900.0
+    assert end["2024"] == 700.0
+
+
+def test_backtest_error_matrix(db_session):
+    result = run_backtest(db_session, [2022, 2023], in_process=False)
+    assert result.index.names == ["as_of_year", "target_year", "resource", "flow_type"]
+    row = result.loc[(2022, 2023, "0916", "END_EQUITY")]
+    # 2,000,000 start - 100,000 costs + 58,500 interest
+    assert row["projected"] == 1_958_500.0
+    assert row["error"] == 8_500.0
+    assert result.loc[(2022, 2023, "0916", "INTEREST"), "projected"] == 58_500.0
+    # Targets never precede their as-of year
+    assert all(t > a for a, t, _, _ in result.index)
+    assert (2023, 2024, "0916", "END_EQUITY") in result.index
+
+
+def test_backtest_is_cached_by_inputs(db_session):
+    first = run_backtest(db_session, [2022], in_process=True)
+    assert len(backtest_service._caches[None]) == 1
+    assert run_backtest(db_session, [2022], in_process=True).equals(first)
+    assert len(backtest_service._caches[None]) == 1
+    db_session.add(ConstructionSource(
+        resource="0916", flow_type="END_EQUITY", fiscal_year="2025", flow_source="ACTUAL", amount=1.0,
+    ))
+    db_session.commit()
+    run_backtest(db_session, [2022], in_process=True)
+    assert len(backtest_service._caches[None]) == 2
+
+
+def test_in_process_and_pool_backtests_agree(db_session):
+    pooled = run_backtest(db_session, [2022, 2023, 2024], in_process=False)
+    backtest_service._caches.clear()
+    assert run_backtest(db_session, [2022, 2023, 2024], in_process=True).equals(pooled)
+
+
+def test_chunks_cover_every_year():
+    assert backtest_service._chunks([1, 2, 3, 4, 5], 2) == [[1, 2, 3], [4, 5]]
+    assert backtest_service._chunks([1], 4) == [[1]]
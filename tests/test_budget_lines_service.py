@@ -0,0 +1,96 @@
+import base64
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import Base, get_read_db
+from app.models import ConstructionBudget
+from app.routes.budget_lines import router as budget_lines_router
+from app.services.budget_lines import (
+    decode_cursor,
+    get_budget_lines,
+    get_budget_line_total,
+)
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    return Session()
+
+
+@pytest.fixture
+def budget_lines(db_session):
+    lines = []
+    for period in (2025, 2026):
+        for program in ("0916", "0930"):
+            for activity in ("A", "B", "C"):
+                lines.append(ConstructionBudget(
+                    budget_period=period,
+                    fund_code="F",
+                    program_code=program,
+                    project_id="P",
+                    activity_id=activity,
+                    line_descr=f"{program} {activity}",
+                    monetary_amount=10.0,
+                ))
+    db_session.add_all(lines)
+    db_session.commit()
+    return lines
+
+
+def _keys(rows):
+    return [(r.budget_period, r.fund_code, r.program_code, r.project_id, r.activity_id) for r in rows]
+
+
+def test_pages_walk_every_line_in_key_order(db_session, budget_lines):
+    seen = []
+    cursor = None
+    while True:
+        rows, cursor = get_budget_lines(db_session, cursor=cursor, limit=5)
+        seen.extend(rows)
+        if cursor is None:
+            break
+    assert len(seen) == len(budget_lines)
+    assert _keys(seen) == sorted(_keys(budget_lines))
+
+
+def test_filters_and_last_page(db_session, budget_lines):
+    rows, cursor = get_budget_lines(db_session, budget_period=2026, program_code="0930", limit=3)
+    assert _keys(rows) == [(2026, "F", "0930", "P", a) for a in ("A", "B", "C")]
+    assert cursor is None
+
+
+def test_total_uses_filters(db_session, budget_lines):
+    assert get_budget_line_total(db_session) == 120.0
+    assert get_budget_line_total(db_session, program_code="0916") == 60.0
+    assert get_budget_line_total(db_session, fund_code="NONE") == 0.0
+
+
+def test_invalid_cursor_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+    # Well-formed JSON with the wrong types is rejected too
+    bad = base64.urlsafe_b64encode(json.dumps(["2026", "F", "0930", "P", 1]).encode()).decode()
+    with pytest.raises(ValueError):
+        decode_cursor(bad)
+
+
+def test_only_the_first_page_carries_the_total(db_session, budget_lines):
+    app = FastAPI()
+    app.include_router(budget_lines_router, prefix="/api")
+    app.dependency_overrides[get_read_db] = lambda: db_session
+    client = TestClient(app)
+
+    first = client.get("/api/budget-lines/", params={"limit": 5}).json()
+    assert first["total_amount"] == 120.0
+    second = client.get("/api/budget-lines/", params={"limit": 5, "cursor": first["next_cursor"]}).json()
+    assert second["total_amount"] is None
+    assert len(second["items"]) == 5
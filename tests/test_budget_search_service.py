@@ -0,0 +1,103 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models import ConstructionBudget
+from app.services.budget_search import (
+    build_match_query,
+    create_search_index,
+    search_budget_lines,
+)
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    return Session()
+
+
+def _line(activity, descr, amount):
+    return ConstructionBudget(
+        budget_period=2025,
+        fund_code="F",
+        program_code="0916",
+        project_id="P",
+        activity_id=activity,
+        line_descr=descr,
+        monetary_amount=amount,
+    )
+
+
+def test_search_indexes_existing_and_new_lines(db_session):
+    db_session.add(_line("A", "Bakersfield High HVAC replacement", 100.0))
+    db_session.commit()
+    create_search_index(db_session)
+    # Lines loaded after the index exists are picked up by the sync triggers
+    db_session.add_all([
+        _line("B", "Bakersfield High roofing", 50.0),
+        _line("C", "Ridgeview High roofing", 25.0),
+    ])
+    db_session.commit()
+
+    hits, count, total = search_budget_lines(db_session, "bakersfield")
+    assert {h["activity_id"] for h in hits} == {"A", "B"}
+    assert count == 2
+    assert total == 150.0
+
+    hits, count, total = search_budget_lines(db_session, "roof high")
+    assert {h["activity_id"] for h in hits} == {"B", "C"}
+
+
+def test_search_tracks_updates_and_deletes(db_session):
+    create_search_index(db_session)
+    line = _line("A", "Golden Valley pool", 10.0)
+    db_session.add(line)
+    db_session.commit()
+    line.line_descr = "Golden Valley stadium"
+    db_session.commit()
+    assert search_budget_lines(db_session, "pool")[1] == 0
+    assert search_budget_lines(db_session, "stadium")[1] == 1
+    db_session.delete(line)
+    db_session.commit()
+    assert search_budget_lines(db_session, "stadium")[1] == 0
+
+
+def test_create_all_builds_index_that_survives_vacuum(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([_line(str(i), f"Portable classroom {i}", 1.0) for i in range(4)])
+    db.commit()
+    db.delete(db.get(ConstructionBudget, (2025, "F", "0916", "P", "0")))
+    db.commit()
+    db.close()
+    # VACUUM renumbers implicit rowids; the index is keyed on line_id instead
+    with engine.connect() as conn:
+        conn.exec_driver_sql("VACUUM")
+
+    db = sessionmaker(bind=engine)()
+    hits, count, _ = search_budget_lines(db, "classroom 3")
+    assert count == 1
+    assert hits[0]["activity_id"] == "3"
+    db.close()
+
+
+def test_search_paginates(db_session):
+    create_search_index(db_session)
+    db_session.add_all([_line(str(i), f"Campus fencing phase {i}", 1.0) for i in range(5)])
+    db_session.commit()
+    first, count, _ = search_budget_lines(db_session, "fencing", limit=3)
+    rest, _, _ = search_budget_lines(db_session, "fencing", limit=3, offset=3)
+    assert count == 5
+    assert len(first) == 3 and len(rest) == 2
+    assert {h["activity_id"] for h in first + rest} == {str(i) for i in range(5)}
+
+
+def test_build_match_query():
+    assert build_match_query("Bakersfield High!", "sqlite") == '"Bakersfield"* "High"*'
+    assert build_match_query("pool", "mssql") == '"pool*"'
+    with pytest.raises(ValueError):
+        build_match_query("  --  ", "sqlite")
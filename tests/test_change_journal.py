@@ -0,0 +1,110 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base, get_read_db
+from app.models import ConstructionChangeJournal, ConstructionChangeSequence, ConstructionSetting, ConstructionStaticRow
+from app.services import change_journal
+from app.services.change_journal import changes_since, latest_sequence
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'journal.db'}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def test_edits_are_journaled_with_before_and_after(engine):
+    db = sessionmaker(bind=engine)()
+    db.add(ConstructionSetting(name="INT_RATE", value="0.03"))
+    row = ConstructionStaticRow(resource="0930", flow_type="DEVFEES", fiscal_year="2025", flow_source="PROJECTED", amount=1.0)
+    db.add(row)
+    db.commit()
+    db.get(ConstructionSetting, "INT_RATE").value = "0.04"
+    db.commit()
+    db.delete(row)
+    db.commit()
+
+    entries = changes_since(db, 0)
+    assert [(e.table_name, e.operation) for e in entries] == [
+        ("CONSTRUCTION_SETTINGS", "INSERT"),
+        ("CONSTRUCTION_STATIC_ROWS", "INSERT"),
+        ("CONSTRUCTION_SETTINGS", "UPDATE"),
+        ("CONSTRUCTION_STATIC_ROWS", "DELETE"),
+    ]
+    assert [e.seq for e in entries] == sorted(e.seq for e in entries)
+    update = entries[2]
+    assert update.row_key == '["INT_RATE"]'
+    assert update.before == '{"name": "INT_RATE", "value": "0.03"}'
+    assert update.after == '{"name": "INT_RATE", "value": "0.04"}'
+    assert entries[1].row_key == f"[{row.id}]"
+    assert entries[3].after is None
+
+    assert [e.operation for e in changes_since(db, entries[1].seq, table="CONSTRUCTION_SETTINGS")] == ["UPDATE"]
+    assert latest_sequence(db) == entries[-1].seq
+    # Seqs are drawn from the sequence row without gaps
+    assert [e.seq for e in entries] == [1, 2, 3, 4]
+    assert db.get(ConstructionChangeSequence, "journal").value == 4
+
+
+def test_journal_written_in_one_batch_with_the_edit(engine):
+    db = sessionmaker(bind=engine)()
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    db.add_all([ConstructionSetting(name=f"S{i}", value="1") for i in range(3)])
+    db.flush()
+    db.add(ConstructionSetting(name="S3", value="1"))
+    db.commit()
+    assert sum("CONSTRUCTION_CHANGE_JOURNAL" in s for s in statements) == 1
+    assert len(changes_since(db, 0)) == 4
+
+
+def test_rolled_back_edits_are_not_journaled(engine, monkeypatch):
+    monkeypatch.setattr(change_journal, "JOURNAL_BATCH_SIZE", 2)
+    db = sessionmaker(bind=engine)()
+    db.add_all([ConstructionSetting(name=f"S{i}", value="1") for i in range(3)])
+    db.flush()
+    db.rollback()
+    assert db.query(ConstructionChangeJournal).count() == 0
+    # The reserved seqs roll back with the edit
+    assert db.get(ConstructionChangeSequence, "journal").value == 0
+
+
+def test_changes_endpoint_pages_by_sequence(engine):
+    from app.main import app
+
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    for i in range(3):
+        db.add(ConstructionSetting(name=f"S{i}", value="1"))
+        db.commit()
+
+    def override():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_read_db] = override
+    try:
+        client = TestClient(app)
+        page = client.get("/api/changes/", params={"since": 0, "limit": 2}).json()
+        assert [c["after"]["name"] for c in page["changes"]] == ["S0", "S1"]
+        assert page["changes"][0]["row_key"] == ["S0"]
+        rest = client.get("/api/changes/", params={"since": page["next_since"]}).json()
+        assert [c["after"]["name"] for c in rest["changes"]] == ["S2"]
+        assert client.get("/api/changes/", params={"since": rest["next_since"]}).json()["changes"] == []
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_importing_models_registers_the_journal():
+    code = "import sys, app.models; assert 'app.services.change_journal' in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).parents[1])
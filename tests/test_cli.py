@@ -0,0 +1,48 @@
+import json
+import subprocess
+import sys
+
+from sqlalchemy import create_engine
+
+from app.db import Base
+import app.models  # noqa: F401  registers tables on Base
+
+
+def _run(*args):
+    result = subprocess.run(
+        [sys.executable, "-m", "app.cli", *args], capture_output=True, text=True,
+    )
+    return result.returncode, json.loads(result.stdout)
+
+
+def _database(tmp_path):
+    path = tmp_path / "cli.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return f"sqlite:///{path}"
+
+
+def test_budget_rows_with_tracers(tmp_path):
+    url = _database(tmp_path)
+    profile_path = tmp_path / "out.prof"
+    code, report = _run(
+        "--database-url", url, "--trace-sql", "--memory", "--profile", str(profile_path),
+        "budget-rows", "--after-year", "2024",
+    )
+    assert code == 0
+    assert report["rows"] == []
+    assert report["sql"]["statements"] >= 1
+    assert report["sql"]["top"][0]["count"] >= 1
+    assert report["memory"]["peak_kb"] > 0
+    assert profile_path.exists()
+    assert report["profile"]["top"]
+
+
+def test_cli_does_not_import_web_stack():
+    code = (
+        "import sys, app.cli; app.cli.build_parser(); "
+        "print(any(m in sys.modules for m in ('fastapi', 'jinja2', 'starlette')))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.stdout.strip() == "False"
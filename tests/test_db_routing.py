@@ -0,0 +1,104 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+import app.db as db_module
+from app.db import Base, SessionLocal, ReadSessionLocal, get_db, get_read_db
+from app.models import ConstructionSetting
+from app.read_after_write import ReadYourWritesMiddleware
+from app.routes.projection import router as projection_router
+from app.routes.projection_ui import router as projection_ui_router
+from app.tenants import current as current_tenant
+
+
+@pytest.fixture
+def primary_and_replica(tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(primary)
+    Base.metadata.create_all(replica)
+    original_primary = SessionLocal.kw["bind"]
+    original_replica = ReadSessionLocal.kw["bind"]
+    SessionLocal.configure(bind=primary)
+    ReadSessionLocal.configure(bind=replica)
+    yield primary, replica
+    SessionLocal.configure(bind=original_primary)
+    ReadSessionLocal.configure(bind=original_replica)
+
+
+@pytest.fixture
+def app(primary_and_replica):
+    primary, _ = primary_and_replica
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.post("/write")
+    def write(db=Depends(get_db)):
+        db.add(ConstructionSetting(name="PRIOR_YEAR", value="2025"))
+        db.commit()
+
+    @app.get("/read")
+    def read(db=Depends(get_read_db)):
+        return {"primary": db.get_bind() is primary, "settings": db.query(ConstructionSetting).count()}
+
+    app.include_router(projection_router, prefix="/api")
+    app.include_router(projection_ui_router)
+    return app
+
+
+def test_reads_use_replica_until_the_client_writes(app):
+    client = TestClient(app)
+    assert client.get("/read").json()["primary"] is False
+
+    client.post("/write")
+
+    # The replica has not caught up, so this client's reads must see the primary's write
+    assert client.get("/read").json() == {"primary": True, "settings": 1}
+
+
+def test_other_clients_keep_reading_the_replica(app):
+    writer, reader = TestClient(app), TestClient(app)
+    writer.post("/write")
+    assert reader.get("/read").json()["primary"] is False
+
+
+def test_background_commits_do_not_pin_reads(app):
+    client = TestClient(app)
+    # Projection jobs commit through sessions made outside get_db
+    db = SessionLocal()
+    db.add(ConstructionSetting(name="INT_RATE", value="0.03"))
+    db.commit()
+    db.close()
+    assert client.get("/read").json()["primary"] is False
+
+
+def test_reads_return_to_replica_after_window(app, monkeypatch):
+    client = TestClient(app)
+    client.post("/write")
+    monkeypatch.setattr(db_module, "READ_AFTER_WRITE_SECONDS", 0.0)
+    assert client.get("/read").json()["primary"] is False
+
+
+def test_reads_without_the_middleware_use_replica(primary_and_replica):
+    _, replica = primary_and_replica
+    gen = get_read_db()
+    assert next(gen).get_bind() is replica
+
+
+def test_running_a_projection_pins_only_that_client(app):
+    runner, other = TestClient(app), TestClient(app)
+    passphrase = current_tenant().passphrase
+    assert runner.post("/api/projection/run", params={"passphrase": passphrase}).json() == {"status": "Success"}
+    assert runner.get("/read").json()["primary"] is True
+    assert other.get("/read").json()["primary"] is False
+
+
+def test_watching_a_projection_finish_pins_the_client(app):
+    watcher, other = TestClient(app), TestClient(app)
+    job = current_tenant().jobs.start(SessionLocal)
+    job.result()
+    assert watcher.post(f"/projection/progress/{job.id}/done").status_code == 204
+    assert watcher.get("/read").json()["primary"] is True
+    assert other.get("/read").json()["primary"] is False
+    assert watcher.post("/projection/progress/missing/done").status_code == 404
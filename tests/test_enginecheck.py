@@ -0,0 +1,67 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from app.enginecheck import (
+    CANDIDATES,
+    Candidate,
+    check_baseline,
+    check_case,
+    compare,
+    generate_case,
+    load_baseline,
+    measure_speedups,
+    run_projection_engine,
+    run_reference,
+)
+
+BASELINE = Path(__file__).with_name("engine_baseline.json")
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_candidates_match_database_loop(seed):
+    case = generate_case(random.Random(seed))
+    assert check_case(case) == {c.name: [] for c in CANDIDATES}
+
+
+def test_harness_catches_a_cent_difference():
+    case = generate_case(random.Random(7), resources=2, years=3)
+
+    def off_by_a_cent(c):
+        return {k: v + 0.01 if k[1] == "END_EQUITY" else v for k, v in run_projection_engine(c).items()}
+
+    assert check_case(case, [Candidate("broken", off_by_a_cent)])["broken"]
+
+
+def test_compare_reports_missing_and_unexpected_rows():
+    expected = {("0916", "INTEREST", "2025"): 100.0, ("0916", "END_EQUITY", "2025"): 5.0}
+    actual = {("0916", "END_EQUITY", "2025"): 5.004, ("0916", "BEG_EQUITY", "2025"): 0.0}
+    assert compare(expected, actual) == [
+        "missing ('0916', 'INTEREST', '2025')",
+        "unexpected ('0916', 'BEG_EQUITY', '2025')",
+    ]
+    # Limited to END_EQUITY, the half-cent difference still matches
+    assert compare(expected, actual, ("END_EQUITY",)) == []
+
+
+def test_reference_projects_every_resource_and_year():
+    case = generate_case(random.Random(3), resources=2, years=3)
+    result = run_reference(case)
+    assert {(k[0], k[2]) for k in result if k[1] == "END_EQUITY"} == {
+        (res, yr) for res in case.resources for yr in case.years
+    }
+
+
+@pytest.mark.benchmark
+def test_engines_stay_faster_than_baseline():
+    baseline = load_baseline(BASELINE)
+    speedups = measure_speedups()
+    assert set(speedups) == set(baseline["speedup"])
+    assert check_baseline(speedups, baseline) == []
+
+
+def test_check_baseline_flags_slower_engine():
+    baseline = {"margin": 0.5, "speedup": {"projection_engine": {"small": 100.0, "large": 100.0}}}
+    speedups = {"projection_engine": {"small": 60.0, "large": 40.0}}
+    assert check_baseline(speedups, baseline) == ["projection_engine large: 40.0x, baseline 100.0x"]
@@ -0,0 +1,120 @@
+import gzip
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import app.services.fragment_cache as fragment_cache_module
+from app.db import Base, get_db
+from app.main import app
+from app.models import ConstructionSetting
+from app.services.fragment_cache import FragmentCache, table_version
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fragments.db'}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def test_version_bumps_on_commit_only(engine):
+    db = sessionmaker(bind=engine)()
+    start = table_version("CONSTRUCTION_SETTINGS")
+    db.add(ConstructionSetting(name="A", value="1"))
+    db.flush()
+    db.rollback()
+    assert table_version("CONSTRUCTION_SETTINGS") == start
+    db.add(ConstructionSetting(name="A", value="1"))
+    db.commit()
+    assert table_version("CONSTRUCTION_SETTINGS") == start + 1
+
+
+def test_build_renders_only_new_rows():
+    cache = FragmentCache("TEST_TABLE")
+    rendered = []
+
+    def render(row):
+        rendered.append(row)
+        return f"<tr>{row}</tr>"
+
+    cache.build(["a", "b"], row_key=lambda r: r, render_row=render, version=1)
+    assert cache.get(1).body == b"<tr>a</tr><tr>b</tr>"
+    assert cache.get(2) is None
+    fragment = cache.build(["a", "c"], row_key=lambda r: r, render_row=render, version=2)
+    assert rendered == ["a", "b", "c"]
+    assert gzip.decompress(fragment.gzip_body) == b"<tr>a</tr><tr>c</tr>"
+
+
+def test_settings_list_served_from_cache_with_etag(engine):
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add(ConstructionSetting(name="INT_RATE", value="0.03"))
+    db.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    def override():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override
+    try:
+        client = TestClient(app)
+        first = client.get("/settings/list")
+        assert first.status_code == 200
+        assert "INT_RATE" in first.text
+        assert first.headers["content-encoding"] == "gzip"
+        queries = len(statements)
+
+        again = client.get("/settings/list")
+        assert again.text == first.text
+        # Only the journal version is read, not the settings
+        assert not [s for s in statements[queries:] if "CONSTRUCTION_SETTINGS" in s]
+
+        not_modified = client.get("/settings/list", headers={"If-None-Match": first.headers["etag"]})
+        assert not_modified.status_code == 304
+        assert first.headers["vary"] == "Accept-Encoding"
+
+        # The identity body is another representation, with its own ETag
+        identity = client.get("/settings/list", headers={"Accept-Encoding": "identity", "If-None-Match": first.headers["etag"]})
+        assert identity.status_code == 200
+        assert "content-encoding" not in identity.headers
+        assert identity.headers["etag"] != first.headers["etag"]
+
+        db.add(ConstructionSetting(name="PRIOR_YEAR", value="2024"))
+        db.commit()
+        changed = client.get("/settings/list", headers={"If-None-Match": first.headers["etag"]})
+        assert changed.status_code == 200
+        assert "PRIOR_YEAR" in changed.text
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_write_from_another_process_invalidates_the_list(engine, monkeypatch):
+    Session = sessionmaker(bind=engine)
+
+    def override():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override
+    try:
+        client = TestClient(app)
+        assert "INT_RATE" not in client.get("/settings/list").text
+        # Another process commits: this one never sees its in-process version bump
+        monkeypatch.setattr(fragment_cache_module, "bump_version", lambda *args: None)
+        db = Session()
+        db.add(ConstructionSetting(name="INT_RATE", value="0.03"))
+        db.commit()
+        assert "INT_RATE" in client.get("/settings/list").text
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,38 @@
+import httpx
+import pytest
+
+from app.loadtest import parse_mix, percentile, response_ok, summarize
+
+
+def test_parse_mix():
+    assert parse_mix("settings=3, projection=1") == {"settings": 3.0, "projection": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("nope=1")
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+
+def test_summarize_reports_per_route():
+    samples = {
+        "settings": [(0.010, True), (0.020, True), (0.030, False), (0.040, True)],
+    }
+    [row] = summarize(samples, elapsed=2.0)
+    assert row["route"] == "GET /api/settings/"
+    assert row["requests"] == 4
+    assert row["throughput_rps"] == 2.0
+    assert row["p50_ms"] == 20.0
+    assert row["p99_ms"] == 40.0
+    assert row["error_rate"] == 0.25
+
+
+def test_response_ok_reads_the_json_body():
+    assert response_ok(httpx.Response(200, json={"status": "Success"}))
+    assert response_ok(httpx.Response(200, json=[{"name": "INT_RATE"}]))
+    assert response_ok(httpx.Response(200, text="<tr></tr>", headers={"content-type": "text/html"}))
+    assert not response_ok(httpx.Response(200, json={"error": "Invalid passphrase"}))
+    assert not response_ok(httpx.Response(200, json={"status": "Failed: UNIQUE constraint failed"}))
@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models import ConstructionSource
+from app.services.projection import insert_rows, calc_interest, calc_balance
+from app.services.projection_engine import project_sources
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    return Session()
+
+
+def test_engine_matches_database_loop(db_session):
+    base_rows = [
+        ["0916", "END_EQUITY", "2024", "ACTUAL", 5_000_000.0],
+        ["0916", "PROCEEDS", "2025", "PROJECTED", 80_000_000.0],
+        ["0916", "COSTS", "2025", "PROJECTED", -30_000_000.0],
+        ["0916", "COSTS", "2026", "PROJECTED", -45_000_000.0],
+        ["0930", "DEVFEES", "2025", "PROJECTED", 4_000_000.0],
+        ["0930", "COSTS", "2026", "PROJECTED", -9_000_000.0],
+    ]
+    years, resources, rate = ["2025", "2026"], ["0916", "0930"], 0.03
+    insert_rows(db_session, base_rows)
+    for res in resources:
+        for yr in years:
+            calc_interest(db_session, yr, res, rate)
+            calc_balance(db_session, yr, res)
+
+    generated = project_sources(base_rows, years, resources, rate)
+    expected = {
+        (r.resource, r.flow_type, r.fiscal_year): r.amount
+        for r in db_session.query(ConstructionSource).filter(
+            ConstructionSource.flow_type.in_(["INTEREST", "BEG_EQUITY", "END_EQUITY"]),
+            ConstructionSource.flow_source == "PROJECTED",
+        )
+    }
+    assert {(r[0], r[1], r[2]): r[4] for r in generated} == expected
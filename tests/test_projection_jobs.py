@@ -0,0 +1,78 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models import ConstructionBudget
+import app.services.projection as projection_service
+from app.services.projection_jobs import JobQueue, ProjectionJob
+from app.services.resource_catalog import seed_catalog
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    monkeypatch.setattr(projection_service, "STATIC_ROWS", [
+        ["0916", "PROCEEDS", "2025", "PROJECTED", 1000.0],
+        ["0930", "DEVFEES", "2026", "PROJECTED", 500.0],
+    ])
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    seed_catalog(db)
+    db.add(ConstructionBudget(
+        budget_period=2025, fund_code="F", program_code="0916",
+        project_id="P", activity_id="A", line_descr="", monetary_amount=-200.0,
+    ))
+    db.commit()
+    db.close()
+    return Session
+
+
+def test_job_reports_every_phase(session_factory):
+    job = JobQueue("test").start(session_factory)
+    assert job.result(timeout=5) == "Success"
+
+    done = {e["phase"]: e for e in job.events if e["status"] == "done"}
+    assert list(done) == ["budget_load", "clear", "static", "write", "compute"]
+    assert done["static"]["rows_written"] == 2
+    assert done["write"]["rows_written"] == 1
+    assert all(e["elapsed"] >= 0 for e in done.values())
+
+    steps = [e for e in job.events if e["status"] == "progress"]
+    # Two resources across two years
+    assert [e["step"] for e in steps] == [1, 2, 3, 4]
+    assert steps[-1]["total"] == 4
+    assert steps[-1]["rows_written"] == done["compute"]["rows_written"]
+    assert [s["status"] for s in job.summary()] == ["done"] * 5
+
+
+def test_summary_keeps_phase_order():
+    job = ProjectionJob("j")
+    job.publish({"phase": "budget_load", "status": "start"})
+    job.publish({"phase": "budget_load", "status": "done", "elapsed": 0.1, "rows_written": 0})
+    summary = job.summary()
+    assert [s["phase"] for s in summary] == ["budget_load", "clear", "static", "write", "compute"]
+    assert summary[0]["status"] == "done"
+    assert summary[1]["status"] == "pending"
+
+
+def test_wait_async_wakes_on_publish_from_another_thread():
+    job = ProjectionJob("j")
+
+    async def watch():
+        threading.Timer(0.05, job.publish, [{"phase": "clear", "status": "start"}]).start()
+        count, done = await job.wait_async(0, timeout=5)
+        assert (count, done) == (1, False)
+        threading.Timer(0.05, job.finish, ["Success"]).start()
+        return await job.wait_async(1, timeout=5)
+
+    assert asyncio.run(watch()) == (1, True)
+
+
+def test_wait_async_times_out_without_events():
+    job = ProjectionJob("j")
+    assert asyncio.run(job.wait_async(0, timeout=0.01)) == (0, False)
@@ -1,14 +1,19 @@
 import pytest
-from sqlalchemy import create_engine, func
+from sqlalchemy import create_engine, func, insert, update
 from sqlalchemy.orm import sessionmaker
 
 from app.db import Base
-from app.models import ConstructionSetting, ConstructionSource, ConstructionBudget
+from app.models import ConstructionSetting, ConstructionSource, ConstructionBudget, ConstructionResourceCatalog
+import app.services.projection as projection_service
+from app.services.resource_catalog import seed_catalog
 from app.services.projection import (
     get_setting,
     clear_sources,
     insert_rows,
     get_budget_rows,
+    stream_budget_rows,
+    stream_project_costs,
+    insert_rows_batched,
     clean_project_costs,
     list_years,
     list_resources,
@@ -16,6 +21,8 @@ from app.services.projection import (
     calc_interest,
     calc_balance,
     run_projection,
+    projection_fingerprint,
+    get_last_run,
     STATIC_ROWS,
 )
 
@@ -25,7 +32,9 @@ def db_session():
     engine = create_engine("sqlite:///:memory:")
     Base.metadata.create_all(engine)
     Session = sessionmaker(bind=engine)
-    return Session()
+    session = Session()
+    seed_catalog(session)
+    return session
 
 
 def test_get_setting_default_and_existing(db_session):
@@ -40,10 +49,22 @@ def test_get_setting_default_and_existing(db_session):
 
 def test_clear_and_insert_rows(db_session):
     rows = [["R1", "T1", "2025", "PROJECTED", 100.0], ["R2", "T2", "2026", "PROJECTED", 200.0]]
-    insert_rows(db_session, rows)
-    assert db_session.query(ConstructionSource).count() == 2
+    insert_rows(db_session, rows, run_id=1)
+    insert_rows(db_session, [["R1", "END_EQUITY", "2024", "ACTUAL", 50.0], ["R3", "T3", "2027", "PROJECTED", 1.0]])
+    assert db_session.query(ConstructionSource).count() == 4
+    assert {r.fiscal_year_num for r in db_session.query(ConstructionSource)} == {2024, 2025, 2026, 2027}
     clear_sources(db_session)
-    assert db_session.query(ConstructionSource).count() == 0
+    # Every projected row is cleared, whether or not a run wrote it
+    assert [r.flow_source for r in db_session.query(ConstructionSource)] == ["ACTUAL"]
+
+
+def test_fiscal_year_num_follows_core_writes(db_session):
+    db_session.execute(insert(ConstructionSource), [
+        {"resource": "R1", "flow_type": "COSTS", "fiscal_year": "2025", "flow_source": "ACTUAL", "amount": 1.0},
+    ])
+    db_session.execute(update(ConstructionSource).values(fiscal_year="2031"))
+    db_session.commit()
+    assert db_session.query(ConstructionSource.fiscal_year_num).scalar() == 2031
 
 
 def test_get_budget_rows(db_session):
@@ -94,6 +115,27 @@ def test_get_budget_rows(db_session):
     assert set(result) == expected
 
 
+def test_stream_budget_rows_writes_while_streaming(db_session):
+    db_session.add_all([
+        ConstructionBudget(
+            budget_period=period, fund_code="F", program_code=program,
+            project_id="P", activity_id="A", line_descr="", monetary_amount=amount,
+        )
+        for period, program, amount in [
+            (2025, "0916", 100.0), (2026, "0916", 0.0), (2026, "0930", 40.0), (2024, "0905", 9.0),
+        ]
+    ])
+    db_session.commit()
+    assert list(stream_budget_rows(db_session, "2024", batch_size=1)) == get_budget_rows(db_session, "2024")
+
+    years, resources = {"2030"}, set()
+    costs = stream_project_costs(stream_budget_rows(db_session, "2024", batch_size=1), years, resources)
+    assert insert_rows_batched(db_session, costs, batch_size=1) == 2
+    assert years == {"2025", "2026", "2030"}
+    assert resources == {"0916", "0930"}
+    assert db_session.query(ConstructionSource).filter_by(flow_type="COSTS").count() == 2
+
+
 def test_clean_project_costs():
     budget_rows = [(2025, "0916", 0.0), (2026, "0917", 100.0)]
     cleaned = clean_project_costs(budget_rows)
@@ -155,4 +197,91 @@ def test_run_projection_creates_sources(db_session):
     assert result == "Success"
     # There should be at least the static rows inserted
     count = db_session.query(ConstructionSource).count()
-    assert count >= len(STATIC_ROWS)
\ No newline at end of file
+    assert count >= len(STATIC_ROWS)
+
+
+def test_projection_fingerprint_tracks_inputs():
+    budget_rows = [(2025, "0916", 100.0)]
+    base = projection_fingerprint(budget_rows, STATIC_ROWS, "2024", 0.03)
+    assert base == projection_fingerprint(list(budget_rows), STATIC_ROWS, "2024", 0.03)
+    assert base != projection_fingerprint([(2025, "0916", 101.0)], STATIC_ROWS, "2024", 0.03)
+    assert base != projection_fingerprint(budget_rows, STATIC_ROWS[:-1], "2024", 0.03)
+    assert base != projection_fingerprint(budget_rows, STATIC_ROWS, "2025", 0.03)
+    assert base != projection_fingerprint(budget_rows, STATIC_ROWS, "2024", 0.04)
+    actuals = [["0916", "END_EQUITY", "2024", "ACTUAL", 5.0]]
+    assert base != projection_fingerprint(budget_rows, STATIC_ROWS, "2024", 0.03, actuals)
+    assert projection_fingerprint(budget_rows, STATIC_ROWS, "2024", 0.03, actuals) != projection_fingerprint(
+        budget_rows, STATIC_ROWS, "2024", 0.03, [["0916", "END_EQUITY", "2024", "ACTUAL", 6.0]]
+    )
+
+
+def test_run_projection_skips_unchanged_inputs(db_session, monkeypatch):
+    monkeypatch.setattr(projection_service, "STATIC_ROWS", [
+        ["0916", "PROCEEDS", "2025", "PROJECTED", 1000.0],
+        ["0930", "DEVFEES", "2026", "PROJECTED", 500.0],
+    ])
+    assert run_projection(db_session) == "Success"
+    first_run = get_last_run(db_session)
+
+    # A marker row in the run's partition survives only if the second run skips clearing it
+    insert_rows(db_session, [["X", "MARKER", "2025", "PROJECTED", 1.0]], run_id=first_run.id)
+    assert run_projection(db_session) == "Success"
+    assert get_last_run(db_session).id == first_run.id
+    assert db_session.query(ConstructionSource).filter_by(flow_type="MARKER").count() == 1
+
+    assert run_projection(db_session, force=True) == "Success"
+    assert db_session.query(ConstructionSource).filter_by(flow_type="MARKER").count() == 0
+
+    db_session.add(ConstructionSetting(name="INT_RATE", value="0.05"))
+    db_session.commit()
+    insert_rows(db_session, [["X", "MARKER", "2025", "PROJECTED", 1.0]], run_id=get_last_run(db_session).id)
+    assert run_projection(db_session) == "Success"
+    assert db_session.query(ConstructionSource).filter_by(flow_type="MARKER").count() == 0
+
+    # Updated actuals are inputs too
+    insert_rows(db_session, [["X", "MARKER", "2025", "PROJECTED", 1.0]], run_id=get_last_run(db_session).id)
+    insert_rows(db_session, [["0916", "END_EQUITY", "2024", "ACTUAL", 250.0]])
+    assert run_projection(db_session) == "Success"
+    assert db_session.query(ConstructionSource).filter_by(flow_type="MARKER").count() == 0
+
+
+def test_get_budget_rows_follows_catalog(db_session):
+    db_session.add_all([
+        ConstructionBudget(
+            budget_period=2025, fund_code="F", program_code=program,
+            project_id="P", activity_id="A", line_descr="", monetary_amount=10.0,
+        )
+        for program in ("0916", "0999")
+    ])
+    db_session.commit()
+    assert [r[1] for r in get_budget_rows(db_session, "2024")] == ["0916"]
+
+    db_session.add(ConstructionResourceCatalog(program_code="0999", active=True, display_order=99))
+    db_session.get(ConstructionResourceCatalog, "0916").active = False
+    db_session.commit()
+    assert [r[1] for r in get_budget_rows(db_session, "2024")] == ["0999"]
+
+    # A fund mapping limits the program to lines in that fund
+    db_session.get(ConstructionResourceCatalog, "0999").fund_code = "G"
+    db_session.commit()
+    assert get_budget_rows(db_session, "2024") == []
+
+
+def test_run_projection_tags_rows_and_records_failures(db_session, monkeypatch):
+    monkeypatch.setattr(projection_service, "STATIC_ROWS", [["0916", "PROCEEDS", "2025", "PROJECTED", 1000.0]])
+    insert_rows(db_session, [["0916", "END_EQUITY", "2024", "ACTUAL", 10.0]])
+
+    def broken(*args):
+        raise RuntimeError("boom")
+
+    with monkeypatch.context() as m:
+        m.setattr(projection_service, "calc_balance", broken)
+        assert run_projection(db_session) == "Failed: boom"
+    assert get_last_run(db_session).status == "Failed: boom"
+
+    # Same inputs, but the failed run must not be reused
+    assert run_projection(db_session) == "Success"
+    run = get_last_run(db_session)
+    assert run.status == "Success"
+    run_ids = {(r.flow_source, r.run_id) for r in db_session.query(ConstructionSource)}
+    assert run_ids == {("ACTUAL", 0), ("PROJECTED", run.id)}
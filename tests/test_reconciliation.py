@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.services.projection import insert_rows
+from app.services.reconciliation import ReconciliationUnavailable, ledger_engine, run_reconciliation
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    insert_rows(db, [
+        ["0916", "END_EQUITY", "2024", "PROJECTED", 1_000_000.0],
+        ["0916", "INTEREST", "2024", "PROJECTED", 30_000.0],
+        ["0916", "COSTS", "2024", "PROJECTED", -500_000.0],
+        ["0930", "END_EQUITY", "2024", "PROJECTED", 200_000.0],
+        ["0916", "END_EQUITY", "2025", "PROJECTED", 900_000.0],
+        ["0916", "END_EQUITY", "2026", "PROJECTED", 1.0],
+        ["0916", "END_EQUITY", "2024", "ACTUAL", 7.0],
+    ])
+    return db
+
+
+# A ledger mapping for the stand-in ledger; 9790 holds closing fund balances
+ACTUALS_SQL = """
+SELECT PROGRAM_CODE AS resource, FISCAL_YEAR AS fiscal_year,
+       CASE WHEN ACCOUNT = '8660' THEN 'INTEREST'
+            WHEN ACCOUNT BETWEEN '4000' AND '7999' THEN 'COSTS'
+            ELSE 'END_EQUITY' END AS flow_type,
+       SUM(POSTED_TOTAL_AMT) AS amount
+FROM PS_LEDGER
+WHERE LEDGER = 'ACTUALS' AND FISCAL_YEAR BETWEEN :start_year AND :end_year
+  AND (ACCOUNT = '8660' OR ACCOUNT BETWEEN '4000' AND '7999' OR ACCOUNT = '9790')
+GROUP BY PROGRAM_CODE, FISCAL_YEAR, flow_type
+"""
+
+
+@pytest.fixture
+def ps_engine(tmp_path, monkeypatch):
+    """SQLite stand-in for the PeopleSoft ledger."""
+    monkeypatch.setenv("PS_ACTUALS_SQL", ACTUALS_SQL)
+    engine = create_engine(f"sqlite:///{tmp_path / 'ps.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE PS_LEDGER (LEDGER TEXT, PROGRAM_CODE TEXT, FISCAL_YEAR INTEGER, "
+            "ACCOUNT TEXT, POSTED_TOTAL_AMT REAL)"
+        ))
+        conn.execute(text("INSERT INTO PS_LEDGER VALUES (:l, :p, :y, :a, :amt)"), [
+            {"l": "ACTUALS", "p": "0916", "y": 2024, "a": "9790", "amt": 1_000_500.0},
+            {"l": "ACTUALS", "p": "0916", "y": 2024, "a": "8660", "amt": 41_000.0},
+            {"l": "ACTUALS", "p": "0916", "y": 2024, "a": "5100", "amt": -300_000.0},
+            {"l": "ACTUALS", "p": "0916", "y": 2024, "a": "6200", "amt": -200_000.0},
+            {"l": "ACTUALS", "p": "0920", "y": 2024, "a": "5100", "amt": -75_000.0},
+            {"l": "ACTUALS", "p": "0916", "y": 2025, "a": "9790", "amt": 700_000.0},
+            {"l": "BUDGET", "p": "0916", "y": 2024, "a": "8660", "amt": 99.0},
+            {"l": "ACTUALS", "p": "0916", "y": 2024, "a": "1000", "amt": 99.0},
+        ])
+    return engine
+
+
+def test_reconciliation_flags_material_variances(db_session, ps_engine):
+    result = run_reconciliation(db_session, ps_engine, 2024, 2025, abs_threshold=1000, pct_threshold=0.05)
+    by_key = result.set_index(["resource", "fiscal_year", "flow_type"])
+
+    # Small variance, under the absolute threshold
+    assert by_key.loc[("0916", 2024, "END_EQUITY"), "variance"] == 500.0
+    assert not by_key.loc[("0916", 2024, "END_EQUITY"), "flagged"]
+    # Costs match once both ledger accounts are summed
+    assert by_key.loc[("0916", 2024, "COSTS"), "variance"] == 0.0
+    # Interest off by more than both thresholds
+    assert by_key.loc[("0916", 2024, "INTEREST"), "flagged"]
+    # Projected with no actual, and actual with no projection
+    assert by_key.loc[("0930", 2024, "END_EQUITY"), "actual"] == 0.0
+    assert by_key.loc[("0930", 2024, "END_EQUITY"), "flagged"]
+    assert by_key.loc[("0920", 2024, "COSTS"), "projected"] == 0.0
+    assert by_key.loc[("0920", 2024, "COSTS"), "flagged"]
+    assert by_key.loc[("0916", 2025, "END_EQUITY"), "flagged"]
+    # Outside the year range
+    assert 2026 not in set(result["fiscal_year"])
+
+
+def test_reconciliation_thresholds_are_configurable(db_session, ps_engine):
+    result = run_reconciliation(db_session, ps_engine, 2024, 2024, abs_threshold=100, pct_threshold=0.0001)
+    flagged = result[result["flagged"]].set_index(["resource", "fiscal_year", "flow_type"])
+    assert ("0916", 2024, "END_EQUITY") in flagged.index
+
+
+def test_reconciliation_requires_configuration(db_session, ps_engine, monkeypatch):
+    monkeypatch.delenv("PS_ACTUALS_SQL")
+    with pytest.raises(ReconciliationUnavailable, match="PS_ACTUALS_SQL"):
+        run_reconciliation(db_session, ps_engine, 2024, 2024, abs_threshold=1, pct_threshold=0)
+    monkeypatch.delenv("PS_DB_URL", raising=False)
+    with pytest.raises(ReconciliationUnavailable, match="PS_DB_URL"):
+        ledger_engine()
@@ -0,0 +1,62 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base, get_db
+from app.models import ConstructionResourceCatalog
+from app.routes.static_rows import router as static_rows_router
+from app.services.resource_catalog import catalog_snapshot, is_active_code, seed_catalog, set_catalog_snapshot
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'catalog.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    seed_catalog(db, ["0930", "0916"])
+    db.close()
+    set_catalog_snapshot(None)
+    yield Session
+    set_catalog_snapshot(None)
+
+
+def _row(resource):
+    return {"resource": resource, "flow_type": "DEVFEES", "fiscal_year": "2025", "flow_source": "PROJECTED", "amount": 1.0}
+
+
+def test_snapshot_is_cached_until_catalog_changes(session_factory):
+    db = session_factory()
+    snapshot = catalog_snapshot(db)
+    assert snapshot.ordered == ("0930", "0916")
+    assert snapshot.codes == frozenset({"0916", "0930"})
+    assert catalog_snapshot(db) is snapshot
+
+    db.add(ConstructionResourceCatalog(program_code="0940", active=True, display_order=5))
+    db.get(ConstructionResourceCatalog, "0930").active = False
+    db.commit()
+    refreshed = catalog_snapshot(db)
+    assert refreshed.ordered == ("0916", "0940")
+    assert not is_active_code(db, "0930")
+    db.close()
+
+
+def test_routes_reject_inactive_codes(session_factory):
+    app = FastAPI()
+    app.include_router(static_rows_router, prefix="/api")
+
+    def override():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override
+    client = TestClient(app)
+    assert client.post("/api/static-rows/", json=_row("0916")).status_code == 200
+    response = client.post("/api/static-rows/", json=_row("0999"))
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Invalid resource: 0999"
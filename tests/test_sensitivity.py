@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from app.services.projection_engine import project_sources
+from app.services.sensitivity import build_inputs, end_equity, solve_break_even
+
+BASE_ROWS = [
+    ["0916", "END_EQUITY", "2024", "ACTUAL", 5_000_000.0],
+    ["0916", "PROCEEDS", "2025", "PROJECTED", 80_000_000.0],
+    ["0916", "COSTS", "2025", "PROJECTED", -30_000_000.0],
+    ["0916", "COSTS", "2026", "PROJECTED", -45_000_000.0],
+    ["0916", "COSTS", "2027", "PROJECTED", -20_000_000.0],
+    ["0930", "DEVFEES", "2025", "PROJECTED", 4_000_000.0],
+    ["0930", "COSTS", "2026", "PROJECTED", -9_000_000.0],
+    ["0930", "COSTS", "2027", "PROJECTED", -1_000_000.0],
+]
+YEARS = ["2025", "2026", "2027"]
+RESOURCES = ["0916", "0930"]
+
+
+def _inputs(rate=0.03):
+    return build_inputs(BASE_ROWS, YEARS, RESOURCES, rate)
+
+
+def _engine_ends(rate, extra_devfees=0.0):
+    rows = [list(r) for r in BASE_ROWS] + [
+        [res, "DEVFEES", yr, "SOLVER", extra_devfees] for res in RESOURCES for yr in YEARS
+    ]
+    generated = project_sources(rows, YEARS, RESOURCES, rate)
+    ends = {(r[0], r[2]): r[4] for r in generated if r[1] == "END_EQUITY"}
+    return np.array([[ends[(res, yr)] for yr in YEARS] for res in RESOURCES])
+
+
+@pytest.mark.parametrize("rate", [0.0, 0.03, 0.075])
+def test_end_equity_matches_engine(rate):
+    assert end_equity(_inputs(), rate=rate)[0] == pytest.approx(_engine_ends(rate))
+
+
+def test_end_equity_vectorizes_adjustments():
+    ends = end_equity(_inputs(), devfees=np.array([[0.0], [2_500_000.0]]))
+    assert ends.shape == (2, 2, 3)
+    assert ends[1] == pytest.approx(_engine_ends(0.03, 2_500_000.0))
+
+
+def test_stored_end_equity_overrides_projection():
+    rows = BASE_ROWS + [["0930", "END_EQUITY", "2025", "ACTUAL", 100.0]]
+    inputs = build_inputs(rows, YEARS, RESOURCES, 0.0)
+    # 2026 starts from the stored 2025 balance, not the projected one
+    assert end_equity(inputs)[0][1][1] == pytest.approx(-9_000_000.0 + 100.0)
+
+
+def test_break_even_devfees_per_resource():
+    results = solve_break_even(_inputs(), "DEVFEES", through_year=2027)
+    for i, solved in enumerate(results):
+        assert solved["status"] == "solved"
+        assert solved["baseline_min_end_equity"] < 0
+        value = solved["break_even"]
+        assert end_equity(_inputs(), devfees=value)[0][i].min() >= 0
+        assert end_equity(_inputs(), devfees=value - 2.0)[0][i].min() < 0
+
+
+def test_break_even_ignores_years_after_horizon():
+    results = {r["resource"]: r for r in solve_break_even(_inputs(), "DEVFEES", through_year=2026)}
+    assert results["0916"]["status"] == "already_met"
+    assert results["0916"]["break_even"] == 0.0
+
+
+def test_break_even_rate_reports_unreachable():
+    results = {r["resource"]: r for r in solve_break_even(_inputs(), "INT_RATE", through_year=2027)}
+    # A negative balance earns no interest, so no rate rescues 0930
+    assert results["0930"]["status"] == "not_met"
+    assert results["0930"]["break_even"] is None
+
+
+def test_break_even_rejects_unknown_parameter():
+    with pytest.raises(ValueError):
+        solve_break_even(_inputs(), "JPALEASE")
+
+
+def test_solve_handles_a_full_sized_catalog():
+    resources = [f"{900 + i:04d}" for i in range(50)]
+    years = [str(y) for y in range(2025, 2041)]
+    rows = [[res, "COSTS", yr, "PROJECTED", -1_000_000.0 * (i % 7)] for i, res in enumerate(resources) for yr in years]
+    inputs = build_inputs(rows, years, resources, 0.03)
+    results = solve_break_even(inputs, "PROCEEDS", through_year=2040, points=5001)
+    assert [r["resource"] for r in results] == resources
+    # Resources with no costs never go negative
+    assert {r["status"] for r in results[::7]} == {"already_met"}
@@ -0,0 +1,143 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app.db import Base
+from app.models import ConstructionSetting, ConstructionStaticRow
+from app.routes.settings import router as settings_router
+from app.routes.settings_ui import router as settings_ui_router
+from app.services.change_journal import latest_sequence
+from app.tenants import LRUCache, TenantConfig, TenantMiddleware, TenantRegistry, load_tenant_configs
+
+
+@pytest.fixture
+def registry(tmp_path):
+    configs = []
+    for name in ("north", "south"):
+        url = f"sqlite:///{tmp_path / f'{name}.db'}"
+        Base.metadata.create_all(create_engine(url))
+        configs.append(TenantConfig(
+            name=name, database_url=url, passphrase=f"{name}-secret",
+            hosts=[f"{name}.example.org"], static_rows_from_table=(name == "south"),
+        ))
+    return TenantRegistry(configs, default_name="north")
+
+
+def _client(registry, trusted_proxies=()):
+    app = FastAPI()
+    app.add_middleware(TenantMiddleware, registry=lambda: registry, trusted_proxies=trusted_proxies)
+    app.include_router(settings_ui_router)
+    app.include_router(settings_router, prefix="/api")
+    return TestClient(app)
+
+
+@pytest.fixture
+def client(registry):
+    return _client(registry)
+
+
+NORTH = {"Host": "north.example.org"}
+SOUTH = {"Host": "south.example.org"}
+
+
+def test_requests_reach_their_tenants_database(client, registry):
+    client.post("/api/settings/", json={"name": "INT_RATE", "value": "0.04"}, headers=SOUTH)
+
+    assert client.get("/api/settings/", headers=NORTH).json() == []
+    south = client.get("/api/settings/", headers=SOUTH).json()
+    assert [s["value"] for s in south] == ["0.04"]
+    # An unknown host falls back to the default tenant
+    assert client.get("/api/settings/").json() == []
+
+
+def test_tenant_header_must_match_host(client):
+    assert client.get("/api/settings/", headers={**SOUTH, "X-Tenant": "south"}).status_code == 200
+    # Without a trusted proxy the header cannot reach another tenant or an unknown one
+    assert client.get("/api/settings/", headers={**NORTH, "X-Tenant": "south"}).status_code == 404
+    assert client.get("/api/settings/", headers={"X-Tenant": "south"}).status_code == 404
+    assert client.get("/api/settings/", headers={"X-Tenant": "east"}).status_code == 404
+
+
+def test_trusted_proxy_picks_tenant_by_header(registry):
+    # TestClient requests come from the "testclient" address
+    client = _client(registry, trusted_proxies={"testclient"})
+    client.post("/api/settings/", json={"name": "INT_RATE", "value": "0.04"}, headers={"X-Tenant": "south"})
+    assert [s["value"] for s in client.get("/api/settings/", headers=SOUTH).json()] == ["0.04"]
+    assert client.get("/api/settings/", headers={"X-Tenant": "east"}).status_code == 404
+
+
+def _version(tenant, table):
+    db = tenant.SessionLocal()
+    try:
+        return latest_sequence(db, table)
+    finally:
+        db.close()
+
+
+def test_fragment_caches_are_isolated(client, registry):
+    north, south = registry.tenants["north"], registry.tenants["south"]
+    client.get("/settings/list", headers=NORTH)
+    client.get("/settings/list", headers=SOUTH)
+    table = ConstructionSetting.__tablename__
+    north_version, south_version = _version(north, table), _version(south, table)
+    north_fragment = north.fragment_cache(table).get(north_version)
+    assert north_fragment is not None
+
+    client.post("/api/settings/", json={"name": "INT_RATE", "value": "0.04"}, headers=SOUTH)
+
+    # Only the tenant that was written to has its version moved on
+    assert _version(south, table) > south_version
+    assert _version(north, table) == north_version
+    assert south.fragment_cache(table).get(_version(south, table)) is None
+    assert north.fragment_cache(table).get(north_version) is north_fragment
+    assert "0.04" in client.get("/settings/list", headers=SOUTH).text
+
+
+def test_static_rows_come_from_the_tenant_table(registry):
+    north, south = registry.tenants["north"], registry.tenants["south"]
+    assert north.static_rows() is None
+    assert south.static_rows() == []
+
+    db = south.SessionLocal()
+    db.add(ConstructionStaticRow(resource="0916", flow_type="PROCEEDS", fiscal_year="2025", flow_source="PROJECTED", amount=10.0))
+    db.commit()
+    db.close()
+
+    assert south.static_rows() == [["0916", "PROCEEDS", "2025", "PROJECTED", 10.0]]
+    # The new version replaced the old entry instead of adding one
+    assert len(south.cache) == 1
+
+
+def test_each_tenant_has_its_own_job_queue(registry):
+    north, south = registry.tenants["north"], registry.tenants["south"]
+    assert north.jobs is not south.jobs
+    assert north.passphrase == "north-secret"
+
+
+def test_every_tenant_needs_its_own_passphrase(tmp_path):
+    url = f"sqlite:///{tmp_path / 'east.db'}"
+    with pytest.raises(ValueError, match="east has no passphrase"):
+        TenantRegistry([TenantConfig(name="east", database_url=url)])
+
+
+def test_load_tenant_configs_expands_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("NORTH_DB", "sqlite:///north.db")
+    path = tmp_path / "tenants.json"
+    path.write_text('{"north": {"database_url": "$NORTH_DB", "max_concurrency": 4}}')
+
+    [config] = load_tenant_configs(str(path))
+    assert config.name == "north"
+    assert config.database_url == "sqlite:///north.db"
+    assert config.max_concurrency == 4
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert len(cache) == 2
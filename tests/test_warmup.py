@@ -0,0 +1,96 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+import app.db as db_module
+import app.warmup as warmup_module
+from app.db import Base, ReadSessionLocal, SessionLocal
+from app.main import create_app
+from app.models import ConstructionSetting
+from app.tenants import TenantConfig, TenantRegistry
+from app.services.resource_catalog import set_catalog_snapshot
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """A fresh registry, so no engine cached by an earlier test is reused."""
+    registry = TenantRegistry([])
+    monkeypatch.setattr(warmup_module, "get_registry", lambda: registry)
+    return registry
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch, registry):
+    engine = create_engine(f"sqlite:///{tmp_path / 'warmup.db'}")
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(db_module, "get_primary_engine", lambda: engine)
+    monkeypatch.setattr(db_module, "get_read_engine", lambda: engine)
+    original_primary = SessionLocal.kw["bind"]
+    original_replica = ReadSessionLocal.kw["bind"]
+    SessionLocal.configure(bind=engine)
+    ReadSessionLocal.configure(bind=engine)
+    set_catalog_snapshot(None)
+    yield engine
+    SessionLocal.configure(bind=original_primary)
+    ReadSessionLocal.configure(bind=original_replica)
+    set_catalog_snapshot(None)
+
+
+def test_startup_warmup_makes_app_ready(database, registry):
+    with TestClient(create_app()) as client:
+        assert client.get("/healthz").json() == {"status": "ok"}
+        ready = client.get("/readyz")
+        assert ready.status_code == 200
+        assert set(ready.json()["warmup"]) == {"templates", "primary_pool", "caches"}
+        default = registry.default
+        assert default.fragment_cache(ConstructionSetting.__tablename__).get(0) is not None
+
+
+def _no_database_url():
+    raise RuntimeError("DATABASE_URL is not set")
+
+
+def test_not_ready_until_database_answers(monkeypatch, registry):
+    monkeypatch.setattr(db_module, "get_primary_engine", _no_database_url)
+    monkeypatch.setattr(warmup_module, "WARMUP_RETRY_SECONDS", 60.0)
+    with TestClient(create_app()) as client:
+        assert client.get("/healthz").status_code == 200
+        assert client.get("/readyz").status_code == 503
+
+
+def test_tenants_file_alone_makes_app_ready(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'north.db'}"
+    Base.metadata.create_all(create_engine(url))
+    monkeypatch.setattr(db_module, "DATABASE_URL", None)
+    monkeypatch.setattr(db_module, "get_primary_engine", _no_database_url)
+    registry = TenantRegistry([TenantConfig(name="north", database_url=url, passphrase="north-secret")], default_name=None)
+    monkeypatch.setattr(warmup_module, "get_registry", lambda: registry)
+
+    assert registry.default.name == "north"
+    with TestClient(create_app()) as client:
+        ready = client.get("/readyz")
+        assert ready.status_code == 200
+        assert set(ready.json()["warmup"]) == {"templates", "north_primary_pool", "north_caches"}
+
+
+def test_failed_warmup_is_retried_in_the_background(database, monkeypatch):
+    attempts = []
+    warmup = warmup_module.warmup
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("database is starting")
+        return warmup()
+
+    monkeypatch.setattr(warmup_module, "warmup", flaky)
+    monkeypatch.setattr(warmup_module, "WARMUP_RETRY_SECONDS", 0.01)
+    with TestClient(create_app()) as client:
+        deadline = time.monotonic() + 5
+        while client.get("/readyz").status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert client.get("/readyz").status_code == 200
+    # Probes only report state; the background task alone retried
+    assert len(attempts) == 3